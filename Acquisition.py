@@ -0,0 +1,1060 @@
+import os
+import time
+import copy
+import math
+import asyncio
+import operator
+import functools
+
+# Acquisition from NI DAQ devices without Qt. DAQTasks owns the nidaqmx tasks of
+# one device and reads one block at a time. AcquisitionSession wraps it for
+# asyncio, and the GUI's DAQWorker wraps it in a QThread.
+# nidaqmx and numpy are imported where they are first used to keep imports fast.
+
+DEFAULT_PATTERN_RATE = 1000 # Hz, sample clock of hardware-timed output patterns
+MAX_PATTERN_SAMPLES = 1000000 # largest pattern buffer loaded onto the device
+INPUT_READ_LATENCY = 0.05 # seconds of samples collected per read
+INPUT_READ_TIMEOUT = 10.0 # seconds a read may wait past its expected duration, the DAQmx default
+INPUT_BUFFER_SECONDS = 2.0 # seconds of samples the input buffer holds, slack for a stalled reader
+INPUT_BUFFER_READS = 4 # the input buffer holds at least this many reads
+MIN_INPUT_BUFFER_SAMPLES = 1000 # per channel, the DAQmx default for slow rates
+MAX_INPUT_BUFFER_BYTES = 64 * 1024 * 1024 # host memory the input buffer may use
+OUTPUT_CHECK_INTERVAL = 1.0 # seconds between checks of the regenerating output tasks
+THERMOCOUPLE_STEP = 0.05 # °C between the points of the precomputed thermocouple tables
+THERMOCOUPLE_MIN = -200.0 # °C, the reference functions flatten out below this
+
+# ===DAQ general functions===
+def get_system_name_from_daq_name(daq_name: str) -> str:
+    if '/' not in daq_name:
+        raise ValueError(f"Invalid channel string: {daq_name}")
+    return daq_name.split('/', 1)[1]
+
+def make_daq_name(dev_name:str, ch_name:str) -> str:
+    return f"{dev_name}/{ch_name}"
+
+def null_config():
+    return {
+        'device': {
+            'model': None, 
+            'name': None, 
+            'sample_rate': None,
+            'pattern_rate': DEFAULT_PATTERN_RATE,
+            'buffer': {}
+            },
+        'analog': {},
+        'digital': {},
+        'analog_output': {},
+        'rules': []
+    }
+
+def normalize_config(config: dict) -> dict:
+    #configs saved by older versions lack the newer sections
+    config['device'].setdefault('pattern_rate', DEFAULT_PATTERN_RATE)
+    config['device'].setdefault('buffer', {})
+    config.setdefault('analog_output', {})
+    config.setdefault('rules', [])
+    for settings in config['analog'].values():
+        settings.setdefault('rate', None)
+        settings.setdefault('calibration', None)
+    for settings in config['analog_output'].values():
+        settings['waveform'] = dict(default_waveform(), **(settings.get('waveform') or {}))
+    return config
+
+def make_default_config(name: str) -> dict:
+    from nidaqmx.system import System
+    system = System.local()
+    dev = system.devices[name]
+    config = {'device':{'model': dev.product_type, 'name': dev.name, 'sample_rate': 10, 'pattern_rate': DEFAULT_PATTERN_RATE, 'buffer': {}}, 'analog':{}, 'digital':{}, 'analog_output':{}, 'rules':[]}
+    #detect analog channels
+    for ai_channel in list(dev.ai_physical_chans):
+        config['analog'][get_system_name_from_daq_name(ai_channel.name)] = {'enabled': False, 'mode': ai_channel.ai_term_cfgs[0].name, 'modes': [ch.name for ch in ai_channel.ai_term_cfgs], 'rate': None, 'calibration': None}
+    #detect digital channels
+    for digital_input_channel in dev.di_lines:
+        config['digital'][get_system_name_from_daq_name(digital_input_channel.name)] = {'enabled': False, 'mode': 'Input', 'modes': ['Input']}
+    for digital_output_channel in dev.do_lines:
+        if(digital_output_channel.name in [ch.name for ch in dev.di_lines]):
+            config['digital'][get_system_name_from_daq_name(digital_output_channel.name)]['modes'] = ["Input", "Output", "Pattern"]
+        else:
+            config['digital'][get_system_name_from_daq_name(digital_output_channel.name)] = {'enabled': False, 'mode': 'Output', 'modes': ['Output', 'Pattern']}
+        config['digital'][get_system_name_from_daq_name(digital_output_channel.name)]['pattern'] = default_pattern()
+    #detect analog output channels
+    ao_range = list(dev.ao_voltage_rngs[:2]) or [-10.0, 10.0]
+    for ao_channel in dev.ao_physical_chans:
+        config['analog_output'][get_system_name_from_daq_name(ao_channel.name)] = {'enabled': False, 'mode': 'Static', 'modes': ANALOG_OUTPUT_MODES, 'range': ao_range, 'value': 0.0, 'waveform': default_waveform()}
+    return config
+
+# ===Buffer functions===
+# DAQmx error codes that mean samples were lost
+OVERRUN_ERRORS = {
+    -200279: "Input buffer overrun, samples were overwritten before they were read",
+    -200361: "Onboard memory overflow, the device could not send samples to the computer fast enough"
+}
+UNDERFLOW_ERRORS = {
+    -200290: "Output underflow, the generation stopped to avoid repeating old samples",
+    -200621: "Onboard memory underflow, the computer could not send samples to the device fast enough"
+}
+
+class AcquisitionError(Exception):
+    """Samples were lost, the message says where and how many."""
+
+def input_buffer_config(config: dict) -> dict:
+    """Input buffer and read sizes in samples per channel.
+
+    Each read waits for at least read_samples, about INPUT_READ_LATENCY
+    seconds of samples, and takes anything more that is waiting. The buffer
+    holds INPUT_BUFFER_SECONDS, capped to MAX_INPUT_BUFFER_BYTES over all
+    channels. The 'buffer' entry of the device config can override
+    'read_latency' (s), 'read_samples' and 'buffer_samples'.
+    """
+    sample_rate = config['device']['sample_rate'] or 1.0
+    overrides = config['device'].get('buffer') or {}
+    check_buffer_overrides(overrides)
+    num_channels = max(1, len([channel for channel, settings in config['analog'].items() if settings['enabled']]))
+    read_latency = overrides.get('read_latency', INPUT_READ_LATENCY)
+    read_samples = overrides.get('read_samples')
+    if(read_samples is None):
+        read_samples = max(1, round(sample_rate * read_latency))
+    buffer_samples = overrides.get('buffer_samples')
+    if(buffer_samples is None):
+        buffer_samples = max(int(sample_rate * INPUT_BUFFER_SECONDS), read_samples * INPUT_BUFFER_READS, MIN_INPUT_BUFFER_SAMPLES)
+        buffer_samples = min(buffer_samples, max(MAX_INPUT_BUFFER_BYTES // (8 * num_channels), read_samples * INPUT_BUFFER_READS))
+    elif(buffer_samples < read_samples):
+        raise ValueError(f"buffer_samples ({buffer_samples}) must be at least read_samples ({read_samples})")
+    return {'read_samples': int(read_samples), 'buffer_samples': int(buffer_samples)}
+
+def check_buffer_overrides(overrides: dict):
+    """Raises ValueError for unknown or out of range settings in the 'buffer' entry of the device config."""
+    for key, value in overrides.items():
+        if(key == 'read_latency'):
+            if(not is_number(value) or value <= 0):
+                raise ValueError(f"read_latency must be a number of seconds above 0, not {value}")
+        elif(key in ('read_samples', 'buffer_samples')):
+            if(not is_number(value) or value != int(value) or value < 1):
+                raise ValueError(f"{key} must be a whole number of samples above 0, not {value}")
+        else:
+            raise ValueError(f"Unknown buffer setting: {key}")
+
+# ===Channel rate functions===
+def channel_decimation(config: dict, channel: str) -> int:
+    #analog inputs slower than the device rate are averaged down from it by a whole factor
+    rate = config['analog'][channel].get('rate')
+    sample_rate = config['device']['sample_rate']
+    if(not rate or not sample_rate or rate >= sample_rate):
+        return 1
+    return max(1, int(round(sample_rate / rate)))
+
+def rate_groups(config: dict) -> list:
+    """Recorded channels grouped by sample rate, fastest first, as [(rate, [channels])].
+
+    Digital channels and outputs always run at the device rate.
+    """
+    groups = {}
+    for channel in recorded_channels(config):
+        factor = channel_decimation(config, channel) if channel in config['analog'] else 1
+        groups.setdefault(factor, []).append(channel)
+    return [(config['device']['sample_rate'] / factor, groups[factor]) for factor in sorted(groups.keys())]
+
+def channel_rates(config: dict) -> dict:
+    return {channel: rate for rate, channels in rate_groups(config) for channel in channels}
+
+def group_path(filename: str, rate: float) -> str:
+    #slower rate groups are recorded next to the main file, e.g. session.10Hz.csv
+    base, extension = os.path.splitext(filename)
+    return f"{base}.{rate:g}Hz{extension}"
+
+class Decimator:
+    """Averages each run of `factor` samples of one channel, carrying partial runs across blocks."""
+    def __init__(self, factor: int):
+        self.factor = factor
+        self.reset()
+
+    def reset(self):
+        import numpy as np
+        self.pending = np.empty(0)
+
+    def process(self, samples) -> list:
+        """A list as long as samples with each average at the last sample of its run and None elsewhere."""
+        import numpy as np
+        values = np.concatenate([self.pending, np.asarray(samples, dtype=float)])
+        count = len(values) // self.factor
+        averages = values[:count * self.factor].reshape(count, self.factor).mean(axis=1)
+        offset = len(self.pending)
+        self.pending = values[count * self.factor:]
+        result = [None] * len(samples)
+        for i, average in enumerate(averages.tolist()):
+            result[(i + 1) * self.factor - 1 - offset] = average
+        return result
+
+# ===Calibration functions===
+# NIST ITS-90 reference functions, thermocouple voltage (mV) = sum(c[i] * t**i) for t (°C) in [low, high]
+THERMOCOUPLE_COEFFICIENTS = {
+    'J': [
+        (-210.0, 760.0, [0.0, 5.03811878150e-2, 3.04758369300e-5, -8.56810657200e-8, 1.32281952950e-10, -1.70529583370e-13, 2.09480906970e-16, -1.25383953360e-19, 1.56317256970e-23]),
+        (760.0, 1200.0, [2.96456256810e2, -1.49761277860, 3.17871039240e-3, -3.18476867010e-6, 1.57208190040e-9, -3.06913690560e-13])
+    ],
+    'K': [
+        (-270.0, 0.0, [0.0, 3.94501280250e-2, 2.36223735980e-5, -3.28589067840e-7, -4.99048287770e-9, -6.75090591730e-11, -5.74103274280e-13, -3.10888728940e-15, -1.04516093650e-17, -1.98892668780e-20, -1.63226974860e-23]),
+        (0.0, 1372.0, [-1.76004136860e-2, 3.89212049750e-2, 1.85587700320e-5, -9.94575928740e-8, 3.18409457190e-10, -5.60728448890e-13, 5.60750590590e-16, -3.20207200030e-19, 9.71511471520e-23, -1.21047212750e-26])
+    ],
+    'T': [
+        (-270.0, 0.0, [0.0, 3.87481063640e-2, 4.41944343470e-5, 1.18443231050e-7, 2.00329735540e-8, 9.01380195590e-10, 2.26511565930e-11, 3.60711542050e-13, 3.84939398830e-15, 2.82135219250e-17, 1.42515947790e-19, 4.87686622860e-22, 1.07955392700e-24, 1.39450270620e-27, 7.97951539270e-31]),
+        (0.0, 400.0, [0.0, 3.87481063640e-2, 3.32922278800e-5, 2.06182434040e-7, -2.18822568460e-9, 1.09968809280e-11, -3.08157587720e-14, 4.54791352900e-17, -2.75129016730e-20])
+    ]
+}
+THERMOCOUPLE_K_EXPONENTIAL = (1.185976e-1, -1.183432e-4, 126.9686) # a0 * exp(a1 * (t - a2)**2) added from 0°C up
+
+def thermocouple_voltage(thermocouple: str, temperatures):
+    """Reference voltage (mV) of a thermocouple at each temperature (°C)."""
+    import numpy as np
+    temperatures = np.asarray(temperatures, dtype=float)
+    voltages = np.full(temperatures.shape, np.nan)
+    for low, high, coefficients in THERMOCOUPLE_COEFFICIENTS[thermocouple]:
+        in_range = (temperatures >= low) & (temperatures <= high)
+        voltages[in_range] = np.polynomial.polynomial.polyval(temperatures[in_range], coefficients)
+    if(thermocouple == 'K'):
+        a0, a1, a2 = THERMOCOUPLE_K_EXPONENTIAL
+        #the exponential belongs to the 0°C to 1372°C function, 0°C included
+        above_zero = (temperatures >= 0) & (temperatures <= THERMOCOUPLE_COEFFICIENTS['K'][-1][1])
+        voltages[above_zero] += a0 * np.exp(a1 * (temperatures[above_zero] - a2) ** 2)
+    return voltages
+
+class Calibration:
+    """Converts the volts read from an analog input to engineering units.
+
+    Built once from the 'calibration' entry of the channel and applied to a
+    whole block with one numpy call:
+    {'type': 'linear', 'gain': 2.0, 'offset': 0.5, 'units': 'bar'}
+    {'type': 'polynomial', 'coefficients': [c0, c1, c2], 'units': 'N'}
+    {'type': 'table', 'volts': [0, 1, 5], 'values': [0, 10, 30], 'units': 'mm'}
+    {'type': 'thermocouple', 'thermocouple': 'K', 'cjc': 25.0, 'units': '°C'}
+    Tables are interpolated linearly and hold their end values outside their
+    range. Thermocouple readings outside the reference range become NaN.
+    """
+    def __init__(self, settings: dict):
+        import numpy as np
+        self.type = settings.get('type')
+        try:
+            if(self.type == 'linear'):
+                self.units = settings.get('units', '')
+                self.coefficients = [float(settings.get('offset', 0.0)), float(settings.get('gain', 1.0))]
+            elif(self.type == 'polynomial'):
+                self.units = settings.get('units', '')
+                self.coefficients = [float(c) for c in settings['coefficients']]
+                if(not self.coefficients):
+                    raise ValueError("Polynomial calibration has no coefficients")
+            elif(self.type == 'table'):
+                self.units = settings.get('units', '')
+                volts = np.asarray(settings['volts'], dtype=float)
+                values = np.asarray(settings['values'], dtype=float)
+                if(volts.ndim != 1 or volts.shape != values.shape or len(volts) < 2):
+                    raise ValueError("Table calibration needs 'volts' and 'values' lists of the same length, at least 2")
+                order = np.argsort(volts)
+                self.table_volts = volts[order]
+                self.table_values = values[order]
+            elif(self.type == 'thermocouple'):
+                self.units = settings.get('units', '°C')
+                thermocouple = settings.get('thermocouple')
+                if(thermocouple not in THERMOCOUPLE_COEFFICIENTS):
+                    raise ValueError(f"Unknown thermocouple type: {thermocouple}, use one of {', '.join(THERMOCOUPLE_COEFFICIENTS)}")
+                #the inverse is a lookup in a fine forward table, offset by the cold junction voltage
+                low = max(THERMOCOUPLE_COEFFICIENTS[thermocouple][0][0], THERMOCOUPLE_MIN)
+                high = THERMOCOUPLE_COEFFICIENTS[thermocouple][-1][1]
+                points = int(round((high - low) / THERMOCOUPLE_STEP)) + 1
+                self.table_values = np.linspace(low, high, points)
+                self.table_volts = thermocouple_voltage(thermocouple, self.table_values) / 1000.0
+                self.cjc_volts = float(thermocouple_voltage(thermocouple, [float(settings.get('cjc', 25.0))])[0]) / 1000.0
+                if(math.isnan(self.cjc_volts)):
+                    raise ValueError(f"Cold junction temperature {settings.get('cjc')} is outside the type {thermocouple} range")
+            else:
+                raise ValueError(f"Unknown calibration type: {self.type}")
+        except KeyError as e:
+            raise ValueError(f"{self.type} calibration has no {e}")
+        except TypeError:
+            raise ValueError(f"{self.type} calibration settings must be numbers: {settings}")
+
+    def apply(self, volts):
+        import numpy as np
+        volts = np.asarray(volts, dtype=float)
+        if(self.type == 'table'):
+            return np.interp(volts, self.table_volts, self.table_values)
+        if(self.type == 'thermocouple'):
+            return np.interp(volts + self.cjc_volts, self.table_volts, self.table_values, left=np.nan, right=np.nan)
+        return np.polynomial.polynomial.polyval(volts, self.coefficients)
+
+def calibration_units(settings) -> str:
+    if(not settings):
+        return 'V'
+    return settings.get('units', '°C' if settings.get('type') == 'thermocouple' else '')
+
+def calibration_errors(config: dict) -> dict:
+    """{channel: message} for each analog input whose calibration cannot be built."""
+    errors = {}
+    for channel, settings in config['analog'].items():
+        calibration = settings.get('calibration')
+        if(not calibration):
+            continue
+        if(not isinstance(calibration, dict)):
+            errors[channel] = f"not a calibration: {calibration}"
+            continue
+        try:
+            Calibration(calibration)
+        except ValueError as e:
+            errors[channel] = str(e)
+    return errors
+
+def channel_units(config: dict) -> dict:
+    """Units of every recorded channel, digital channels have none."""
+    units = {}
+    for channel in recorded_channels(config):
+        if(channel in config['analog']):
+            units[channel] = calibration_units(config['analog'][channel].get('calibration'))
+        elif(channel in config['analog_output']):
+            units[channel] = 'V'
+        else:
+            units[channel] = ''
+    return units
+
+# ===Output pattern functions===
+ANALOG_OUTPUT_MODES = ['Static', 'Sine', 'Ramp', 'File']
+
+def default_pattern() -> dict:
+    return {'type': 'pulse', 'period': 1.0, 'duty_cycle': 0.5, 'delay': 0.0}
+
+def make_pattern(pattern: dict, rate: float):
+    """One period of a digital pattern as a boolean array sampled at rate.
+
+    'pulse' patterns use period, duty_cycle and delay (seconds). 'sequence'
+    patterns hold each entry of values for step seconds.
+    """
+    import numpy as np
+    if(pattern['type'] == 'pulse'):
+        num_samples = max(int(round(pattern['period'] * rate)), 1)
+        samples = np.zeros(num_samples, dtype=bool)
+        samples[:int(round(pattern['duty_cycle'] * num_samples))] = True
+        return np.roll(samples, int(round(pattern.get('delay', 0.0) * rate)))
+    if(pattern['type'] == 'sequence'):
+        step_samples = max(int(round(pattern['step'] * rate)), 1)
+        return np.repeat(np.asarray(pattern['values'], dtype=bool), step_samples)
+    raise ValueError(f"Unknown pattern type: {pattern['type']}")
+
+def default_waveform() -> dict:
+    return {'frequency': 1.0, 'amplitude': 1.0, 'offset': 0.0, 'file': ''}
+
+def make_waveform(mode: str, waveform: dict, rate: float):
+    """One period of an analog output waveform in volts sampled at rate.
+
+    'Sine' and 'Ramp' use frequency (Hz), amplitude and offset (V). 'File'
+    plays the first column of a CSV file, one value per sample.
+    """
+    import numpy as np
+    check_waveform(mode, waveform)
+    if(mode == 'File'):
+        return np.atleast_1d(np.loadtxt(waveform['file'], delimiter=',', usecols=0, dtype=float))
+    num_samples = max(int(round(rate / waveform['frequency'])), 1)
+    phase = np.arange(num_samples) / num_samples
+    if(mode == 'Sine'):
+        return waveform['offset'] + waveform['amplitude'] * np.sin(2 * np.pi * phase)
+    return waveform['offset'] + waveform['amplitude'] * (2 * phase - 1)
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def check_waveform(mode: str, waveform: dict):
+    """Raises ValueError if the waveform settings of a mode are missing or out of range."""
+    if(mode == 'File'):
+        if(not waveform.get('file')):
+            raise ValueError("File waveform has no 'file'")
+        return
+    if(mode not in ('Sine', 'Ramp')):
+        raise ValueError(f"Unknown waveform mode: {mode}")
+    for key in ('frequency', 'amplitude', 'offset'):
+        if(not is_number(waveform.get(key))):
+            raise ValueError(f"Waveform {key} must be a number, not {waveform.get(key)}")
+    if(waveform['frequency'] <= 0):
+        raise ValueError(f"Waveform frequency must be above 0Hz, not {waveform['frequency']}")
+
+def waveform_errors(config: dict) -> list:
+    """A message for each analog output whose waveform cannot be played.
+
+    The Sine and Ramp settings are checked for every channel, since its mode
+    can be changed in the GUI later. The file of a File mode channel is read.
+    """
+    errors = []
+    for channel, settings in config['analog_output'].items():
+        waveform = settings.get('waveform') or {}
+        try:
+            check_waveform('Sine', waveform)
+            if(settings.get('mode') == 'File'):
+                make_waveform('File', waveform, 1.0)
+        except (OSError, ValueError) as e:
+            errors.append(f"{channel}: {e}")
+    return errors
+
+def make_pattern_buffer(patterns: list, rate: float):
+    """Patterns repeated to a common length so the buffer regenerates without a seam."""
+    return tile_periods([make_pattern(pattern, rate) for pattern in patterns])
+
+def make_waveform_buffer(waveforms: list, rate: float):
+    return tile_periods([make_waveform(waveform['mode'], waveform['waveform'], rate) for waveform in waveforms])
+
+def tile_periods(periods: list):
+    import numpy as np
+    length = 1
+    for period in periods:
+        length = length * len(period) // math.gcd(length, len(period))
+        if(length > MAX_PATTERN_SAMPLES):
+            raise ValueError(f"Pattern buffer needs more than {MAX_PATTERN_SAMPLES} samples")
+    return np.stack([np.tile(period, length // len(period)) for period in periods])
+
+# ===Output rule functions===
+RULE_CONDITIONS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+class OutputRule:
+    """Sets a digital output once an input meets a condition for a number of consecutive samples.
+
+    Built from a config entry such as
+    {'input': 'ai0', 'condition': '>', 'threshold': 4.5, 'samples': 10, 'output': 'port1/line0', 'value': 1}.
+    The run of matching samples carries over from one block to the next.
+    """
+    def __init__(self, rule: dict):
+        for key in ('input', 'condition', 'threshold', 'output'):
+            if(key not in rule):
+                raise ValueError(f"Output rule has no '{key}'")
+        if(rule['condition'] not in RULE_CONDITIONS):
+            raise ValueError(f"Unknown rule condition: {rule['condition']}")
+        self.input = rule['input']
+        self.condition = RULE_CONDITIONS[rule['condition']]
+        try:
+            self.threshold = float(rule['threshold'])
+            self.samples = max(int(rule.get('samples', 1)), 1)
+            self.value = int(rule.get('value', 1))
+        except (TypeError, ValueError):
+            raise ValueError(f"Output rule threshold, samples and value must be numbers: {rule}")
+        if(self.value not in (0, 1)):
+            raise ValueError(f"Output rule value must be 0 or 1, not {self.value}")
+        self.output = rule['output']
+        self.run_length = 0
+
+    def reset(self):
+        self.run_length = 0
+
+    def evaluate(self, values):
+        """Index of the sample in the block where the rule is met, or None."""
+        import numpy as np
+        matches = self.condition(np.asarray(values, dtype=float), self.threshold)
+        if(len(matches) == 0):
+            return None
+        #length of the run of matching samples ending at each index
+        indices = np.arange(len(matches))
+        last_mismatch = np.maximum.accumulate(np.where(matches, -1, indices))
+        run_lengths = indices - last_mismatch
+        run_lengths[last_mismatch < 0] += self.run_length
+        self.run_length = int(run_lengths[-1])
+        met = np.flatnonzero(run_lengths >= self.samples)
+        if(len(met) == 0):
+            return None
+        return int(met[0])
+
+def split_rules(rules: list) -> tuple:
+    """The rules that can be built, and a message for each one that cannot."""
+    valid = []
+    errors = []
+    for i, rule in enumerate(rules):
+        if(not isinstance(rule, dict)):
+            errors.append(f"Rule {i + 1}: not a rule: {rule}")
+            continue
+        try:
+            OutputRule(rule)
+            valid.append(rule)
+        except ValueError as e:
+            errors.append(f"Rule {i + 1}: {e}")
+    return valid, errors
+
+# parts of the config each DAQ task is built from, used to rebuild only the tasks that changed
+def analog_task_config(config: dict) -> dict:
+    channels = {channel: settings['mode'] for channel, settings in config['analog'].items() if settings['enabled']}
+    decimation = {channel: channel_decimation(config, channel) for channel in channels}
+    calibration = {channel: config['analog'][channel].get('calibration') for channel in channels if config['analog'][channel].get('calibration')}
+    task_config = {'name': config['device']['name'], 'sample_rate': config['device']['sample_rate'], 'channels': channels, 'decimation': decimation, 'calibration': calibration}
+    task_config.update(input_buffer_config(config))
+    return task_config
+
+def digital_input_task_config(config: dict) -> dict:
+    channels = [channel for channel, settings in config['digital'].items() if settings['enabled'] and settings['mode'] == 'Input']
+    return {'name': config['device']['name'], 'channels': channels}
+
+def digital_output_task_config(config: dict) -> dict:
+    channels = [channel for channel, settings in config['digital'].items() if settings['enabled'] and settings['mode'] == 'Output']
+    return {'name': config['device']['name'], 'channels': channels}
+
+def digital_pattern_task_config(config: dict) -> dict:
+    channels = {channel: settings.get('pattern', default_pattern()) for channel, settings in config['digital'].items() if settings['enabled'] and settings['mode'] == 'Pattern'}
+    #patterns start with the analog task when there is one so recorded values line up
+    triggered = len(analog_task_config(config)['channels']) > 0
+    return {'name': config['device']['name'], 'rate': config['device'].get('pattern_rate', DEFAULT_PATTERN_RATE), 'triggered': triggered, 'channels': channels}
+
+def analog_output_task_config(config: dict) -> dict:
+    channels = {channel: {'range': settings['range'], 'value': settings['value']} for channel, settings in config['analog_output'].items() if settings['enabled'] and settings['mode'] == 'Static'}
+    return {'name': config['device']['name'], 'channels': channels}
+
+def analog_waveform_task_config(config: dict) -> dict:
+    channels = {channel: {'range': settings['range'], 'mode': settings['mode'], 'waveform': settings['waveform']} for channel, settings in config['analog_output'].items() if settings['enabled'] and settings['mode'] != 'Static'}
+    triggered = len(analog_task_config(config)['channels']) > 0
+    return {'name': config['device']['name'], 'rate': config['device'].get('pattern_rate', DEFAULT_PATTERN_RATE), 'triggered': triggered, 'channels': channels}
+
+TASK_CONFIGS = {
+    'analog': analog_task_config,
+    'digital_input': digital_input_task_config,
+    'digital_output': digital_output_task_config,
+    'digital_pattern': digital_pattern_task_config,
+    'analog_output': analog_output_task_config,
+    'analog_waveform': analog_waveform_task_config
+}
+
+def recorded_channels(config: dict) -> list:
+    channels = [channel for channel in config['analog'].keys() if config['analog'][channel]['enabled']]
+    channels += [channel for channel in config['digital'].keys() if config['digital'][channel]['enabled']]
+    channels += [channel for channel in config['analog_output'].keys() if config['analog_output'][channel]['enabled']]
+    return channels
+
+def output_controls_config(config: dict) -> tuple:
+    #outputs that are set from the Outputs panel
+    return (digital_output_task_config(config), analog_output_task_config(config))
+
+def plot_config(config: dict) -> tuple:
+    #what the plots are built from, other changes leave the plotted data in place
+    return (config['device']['sample_rate'], recorded_channels(config), channel_rates(config), channel_units(config))
+
+# === DAQ Tasks ===
+class DAQTasks:
+    """The nidaqmx tasks for one device, built from a GUI config.
+
+    update_config() rebuilds only the tasks whose part of the config changed.
+    read_block() reads what the device has acquired, evaluates the output
+    rules and writes changed outputs. It returns a block
+    {'timestamp': [...], channel: [...]} with the commanded value of every
+    output alongside the inputs, or None if nothing new was acquired.
+    Calibrated analog inputs are in their engineering units, and output
+    rules compare against those. Analog inputs with a lower rate than the
+    device are averaged down and hold None except at the last sample of each
+    averaging run, so every channel stays on the device's timeline.
+    """
+    def __init__(self):
+        self.sample_interval = None
+        self.user_input_channels = []
+        self.digital_channels = []
+        self.analog_channels = []
+        self.decimators = {} # analog channel -> Decimator, for channels slower than the device
+        self.calibrations = {} # analog channel index -> Calibration
+        self.user_inputs = {}
+        self.written_outputs = None # last values written to the digital output task
+        self.pattern_channels = []
+        self.pattern_buffer = None # channel x sample array the device regenerates
+        self.pattern_rate = DEFAULT_PATTERN_RATE
+        self.analog_output_channels = []
+        self.analog_outputs = {}
+        self.written_analog_outputs = None # last values written to the analog output task
+        self.waveform_channels = []
+        self.waveform_buffer = None # channel x sample array the device regenerates
+        self.waveform_rate = DEFAULT_PATTERN_RATE
+        self.rules_config = []
+        self.rules = []
+        self.rule_callback = None # called with (output channel, new value, input to output latency in s)
+        self.total_num_analog_samples = 0
+        self.start_time = 0.0
+        self.read_samples = 1 # samples per channel each read aims for
+        self.buffer_samples = 0 # size of the input buffer, samples per channel
+        self.peak_buffer_usage = 0.0 # largest fraction of the input buffer waiting at a read
+        self.last_output_check = 0.0
+
+        self.no_analog = True
+        self.no_digital_in = True
+        self.no_digital_out = True
+        self.no_digital_pattern = True
+        self.no_analog_out = True
+        self.no_analog_waveform = True
+
+        self.analog_task = None
+        self.digital_input_task = None
+        self.digital_output_task = None
+        self.digital_pattern_task = None
+        self.analog_output_task = None
+        self.analog_waveform_task = None
+        self.task_configs = {} # task name -> part of the config the task was built from
+
+    @property
+    def poll_interval(self) -> float:
+        #seconds to wait between read_block calls, analog reads wait for their samples themselves
+        if(self.no_analog):
+            return self.sample_interval
+        return 0.0
+
+    def output_channels(self) -> list:
+        return self.user_input_channels + self.pattern_channels + self.analog_output_channels + self.waveform_channels
+
+    def start(self):
+        self.written_outputs = None
+        self.written_analog_outputs = None
+        self.total_num_analog_samples = 0
+        self.peak_buffer_usage = 0.0
+        self.start_time = time.time()
+        self.last_output_check = self.start_time
+        for rule in self.rules:
+            rule.reset()
+        for decimator in self.decimators.values():
+            decimator.reset()
+        #the pattern tasks wait for the analog start trigger, so they are started first
+        if(self.digital_pattern_task and not self.no_digital_pattern):
+            self.digital_pattern_task.start()
+        if(self.analog_waveform_task and not self.no_analog_waveform):
+            self.analog_waveform_task.start()
+        if(self.analog_task and not self.no_analog):
+            self.analog_task.start()
+        if(self.digital_input_task and not self.no_digital_in):
+            self.digital_input_task.start()
+        self.set_outputs()
+
+    def read_block(self):
+        if(self.no_analog):
+            block = self.read_no_analog()
+        else:
+            block = self.read_analog()
+        self.set_outputs()
+        if(time.time() - self.last_output_check >= OUTPUT_CHECK_INTERVAL):
+            self.check_outputs()
+        return block
+
+    def read_analog(self):
+        try:
+            #wait for at least read_samples and take everything else that is waiting
+            waiting = self.analog_task.in_stream.avail_samp_per_chan
+            analog_samples = self.analog_task.read(number_of_samples_per_channel=max(self.read_samples, waiting), timeout=self.read_samples * self.sample_interval + INPUT_READ_TIMEOUT)
+        except Exception as e:
+            if(getattr(e, 'error_code', None) in OVERRUN_ERRORS):
+                raise AcquisitionError(self.overrun_message(e.error_code)) from e
+            raise
+        read_time = time.perf_counter()
+        if(not isinstance(analog_samples, list)):
+            analog_samples = [analog_samples]
+        #one channel is read as a flat list of samples
+        if(analog_samples and not isinstance(analog_samples[0], list)):
+            analog_samples = [analog_samples]
+        current_num_analog_samples = len(analog_samples[0]) if analog_samples else 0
+        if(current_num_analog_samples == 0):
+            return None
+        self.peak_buffer_usage = max(self.peak_buffer_usage, waiting / self.buffer_samples)
+        for i, calibration in self.calibrations.items():
+            analog_samples[i] = calibration.apply(analog_samples[i]).tolist()
+        analog_timestamps = [self.sample_interval * i for i in range(self.total_num_analog_samples, self.total_num_analog_samples + current_num_analog_samples)]
+        self.total_num_analog_samples = self.total_num_analog_samples + current_num_analog_samples
+        digital_samples = self.read_digital(current_num_analog_samples)
+        self.apply_rules(analog_samples, digital_samples, read_time)
+        return self.make_block(analog_timestamps, analog_samples, digital_samples)
+
+    def overrun_message(self, error_code):
+        message = f"{OVERRUN_ERRORS[error_code]} ({error_code}) after {time.time() - self.start_time:.1f}s. {self.total_num_analog_samples} samples per channel were read"
+        try:
+            acquired = self.analog_task.in_stream.total_samp_per_chan_acquired
+            #the buffer still holds the newest buffer_samples, everything between was overwritten
+            message += f" of {acquired} acquired, about {max(0, acquired - self.total_num_analog_samples - self.buffer_samples)} were lost"
+        except Exception:
+            pass
+        return message + f". The buffer holds {self.buffer_samples} samples per channel and was at most {self.peak_buffer_usage:.0%} full at a read. Increase buffer_samples or lower the sample rate."
+
+    def check_outputs(self):
+        #regenerating outputs only report an underflow when they are queried
+        self.last_output_check = time.time()
+        outputs = [("Digital pattern", self.digital_pattern_task, not self.no_digital_pattern), ("Analog waveform", self.analog_waveform_task, not self.no_analog_waveform)]
+        for name, task, active in outputs:
+            if(not task or not active):
+                continue
+            try:
+                task.is_task_done()
+            except Exception as e:
+                if(getattr(e, 'error_code', None) not in UNDERFLOW_ERRORS):
+                    raise
+                message = f"{name}: {UNDERFLOW_ERRORS[e.error_code]} ({e.error_code})"
+                try:
+                    message += f" after {task.out_stream.total_samp_per_chan_generated} samples per channel"
+                except Exception:
+                    pass
+                raise AcquisitionError(message + ". Lower the pattern rate.") from e
+
+    def read_no_analog(self):
+        digital_samples = self.read_digital(1)
+        self.apply_rules([], digital_samples, time.perf_counter())
+        return self.make_block([time.time() - self.start_time], [], digital_samples)
+
+    def read_digital(self, num_samples):
+        #digital inputs are read once per block and held for each analog sample
+        if(self.no_digital_in):
+            return []
+        digital_sample = self.digital_input_task.read()
+        try:
+            return [[sample] * num_samples for sample in digital_sample]
+        except TypeError:
+            return [[digital_sample] * num_samples]
+
+    def make_block(self, timestamps, analog, digital_in):
+        block = {'timestamp': timestamps}
+        block.update(zip(self.analog_channels, analog))
+        for channel, decimator in self.decimators.items():
+            block[channel] = decimator.process(block[channel])
+        block.update(zip(self.digital_channels, digital_in))
+        block.update(zip(self.output_channels(), self.output_values(timestamps)))
+        return block
+
+    def set_outputs(self):
+        #only write when a value changed
+        if(not self.no_digital_out):
+            output_data = [self.user_inputs[channel] == 1 for channel in self.user_input_channels]
+            if(output_data != self.written_outputs):
+                self.digital_output_task.write(output_data)
+                self.written_outputs = output_data
+        if(not self.no_analog_out):
+            analog_output_data = [self.analog_outputs[channel] for channel in self.analog_output_channels]
+            if(analog_output_data != self.written_analog_outputs):
+                self.analog_output_task.write(analog_output_data if len(analog_output_data) > 1 else analog_output_data[0])
+                self.written_analog_outputs = analog_output_data
+
+    def output_values(self, timestamps):
+        #commanded value of every output at each timestamp, in the order of output_channels()
+        values = [[self.user_inputs[channel]] * len(timestamps) for channel in self.user_input_channels]
+        values += self.pattern_values(timestamps)
+        values += [[self.analog_outputs[channel]] * len(timestamps) for channel in self.analog_output_channels]
+        values += self.waveform_values(timestamps)
+        return values
+
+    def apply_rules(self, analog, digital_in, read_time):
+        #evaluated on each block as soon as it is read so outputs react without a UI round trip
+        rules = self.rules
+        if(not rules):
+            return
+        inputs = dict(zip(self.analog_channels, analog))
+        inputs.update(zip(self.digital_channels, digital_in))
+        changed = []
+        for rule in rules:
+            if(rule.input not in inputs or rule.output not in self.user_inputs):
+                continue
+            index = rule.evaluate(inputs[rule.input])
+            if(index is not None and self.user_inputs[rule.output] != rule.value):
+                self.user_inputs[rule.output] = rule.value
+                #age of the triggering sample when the block was read
+                sample_age = (len(inputs[rule.input]) - 1 - index) * self.sample_interval
+                changed.append((rule, sample_age))
+        if(changed):
+            self.set_outputs()
+            write_time = time.perf_counter()
+            for rule, sample_age in changed:
+                if(self.rule_callback):
+                    self.rule_callback(rule.output, rule.value, write_time - read_time + sample_age)
+
+    def set_rules(self, rules_config):
+        if(rules_config == self.rules_config):
+            return
+        try:
+            self.rules = [OutputRule(rule) for rule in rules_config]
+            self.rules_config = copy.deepcopy(rules_config)
+        except:
+            self.rules = []
+            self.rules_config = []
+            raise
+
+    def pattern_values(self, timestamps):
+        if(self.no_digital_pattern or not timestamps):
+            return []
+        return DAQTasks.buffer_values(self.pattern_buffer, self.pattern_rate, timestamps).astype(int).tolist()
+
+    def waveform_values(self, timestamps):
+        if(self.no_analog_waveform or not timestamps):
+            return []
+        return DAQTasks.buffer_values(self.waveform_buffer, self.waveform_rate, timestamps).tolist()
+
+    def buffer_values(buffer, rate, timestamps):
+        #values the device is playing at each timestamp, looked up from the loaded buffer
+        import numpy as np
+        indices = (np.asarray(timestamps) * rate).astype(int) % buffer.shape[1]
+        return buffer[:, indices]
+
+    def all_tasks(self):
+        return [self.analog_task, self.digital_input_task, self.digital_output_task, self.digital_pattern_task, self.analog_output_task, self.analog_waveform_task]
+
+    def stop(self):
+        try:
+            for task in self.all_tasks():
+                if(task):
+                    task.stop()
+        except:
+            self.analog_task = None
+            self.digital_input_task = None
+            self.digital_output_task = None
+            self.digital_pattern_task = None
+            self.analog_output_task = None
+            self.analog_waveform_task = None
+            self.task_configs = {}
+
+    def close(self):
+        for task in self.all_tasks():
+            if(task):
+                task.close()
+        self.analog_task = None
+        self.digital_input_task = None
+        self.digital_output_task = None
+        self.digital_pattern_task = None
+        self.analog_output_task = None
+        self.analog_waveform_task = None
+        self.task_configs = {}
+
+    def requires_restart(self, config):
+        if(not self.sample_interval or not config['device']['sample_rate']):
+            return True
+        if(self.sample_interval != 1.0 / config['device']['sample_rate']):
+            return True
+        return any(self.task_configs.get(key) != task_config(config) for key, task_config in TASK_CONFIGS.items())
+
+    def update_config(self, config):
+        #only the tasks whose part of the config changed are rebuilt
+        try:
+            builders = {
+                'analog': self.build_analog_task,
+                'digital_input': self.build_digital_input_task,
+                'digital_output': self.build_digital_output_task,
+                'digital_pattern': self.build_digital_pattern_task,
+                'analog_output': self.build_analog_output_task,
+                'analog_waveform': self.build_analog_waveform_task
+            }
+            new_task_configs = {key: task_config(config) for key, task_config in TASK_CONFIGS.items()}
+            for key, build_task in builders.items():
+                if(self.task_configs.get(key) != new_task_configs[key]):
+                    build_task(new_task_configs[key])
+            self.task_configs = new_task_configs
+            #set sample rate
+            self.sample_interval = 1.0 / config['device']['sample_rate']
+        except:
+            self.task_configs = {}
+            raise
+
+    def build_analog_task(self, task_config):
+        import nidaqmx
+        from nidaqmx.constants import AcquisitionType, TerminalConfiguration
+        self.analog_channels = []
+        self.decimators = {channel: Decimator(factor) for channel, factor in task_config['decimation'].items() if factor > 1}
+        self.calibrations = {i: Calibration(task_config['calibration'][channel]) for i, channel in enumerate(task_config['channels']) if channel in task_config['calibration']}
+        self.no_analog = True
+        if(self.analog_task):
+            self.analog_task.close()
+        self.analog_task = nidaqmx.Task()
+        for channel, mode in task_config['channels'].items():
+            self.analog_task.ai_channels.add_ai_voltage_chan(make_daq_name(task_config['name'], channel), terminal_config=TerminalConfiguration[mode])
+            self.no_analog = False
+            self.analog_channels.append(channel)
+        self.read_samples = task_config['read_samples']
+        self.buffer_samples = task_config['buffer_samples']
+        if(not self.no_analog):
+            #for continuous acquisition samps_per_chan sets the input buffer size
+            self.analog_task.timing.cfg_samp_clk_timing(rate = task_config['sample_rate'], sample_mode=AcquisitionType.CONTINUOUS, samps_per_chan=self.buffer_samples)
+
+    def build_digital_input_task(self, task_config):
+        import nidaqmx
+        self.digital_channels = []
+        self.no_digital_in = True
+        if(self.digital_input_task):
+            self.digital_input_task.close()
+        self.digital_input_task = nidaqmx.Task()
+        for channel in task_config['channels']:
+            self.digital_input_task.di_channels.add_di_chan(make_daq_name(task_config['name'], channel))
+            self.no_digital_in = False
+            self.digital_channels.append(channel)
+
+    def build_digital_output_task(self, task_config):
+        import nidaqmx
+        self.no_digital_out = True
+        self.user_inputs = {}
+        self.user_input_channels = []
+        self.written_outputs = None
+        if(self.digital_output_task):
+            self.digital_output_task.close()
+        self.digital_output_task = nidaqmx.Task()
+        for channel in task_config['channels']:
+            self.user_inputs[channel] = 0
+            self.user_input_channels.append(channel)
+            self.digital_output_task.do_channels.add_do_chan(make_daq_name(task_config['name'], channel))
+            self.no_digital_out = False
+
+    def build_digital_pattern_task(self, task_config):
+        #the pattern is written once and regenerated from the device's onboard buffer
+        import nidaqmx
+        from nidaqmx.constants import AcquisitionType
+        self.no_digital_pattern = True
+        self.pattern_channels = []
+        self.pattern_buffer = None
+        if(self.digital_pattern_task):
+            self.digital_pattern_task.close()
+            self.digital_pattern_task = None
+        if(not task_config['channels']):
+            return
+        self.pattern_rate = task_config['rate']
+        self.pattern_buffer = make_pattern_buffer(list(task_config['channels'].values()), self.pattern_rate)
+        self.digital_pattern_task = nidaqmx.Task()
+        for channel in task_config['channels'].keys():
+            self.digital_pattern_task.do_channels.add_do_chan(make_daq_name(task_config['name'], channel))
+            self.pattern_channels.append(channel)
+        self.digital_pattern_task.timing.cfg_samp_clk_timing(rate = self.pattern_rate, sample_mode=AcquisitionType.CONTINUOUS, samps_per_chan=self.pattern_buffer.shape[1])
+        if(task_config['triggered']):
+            self.digital_pattern_task.triggers.start_trigger.cfg_dig_edge_start_trig(f"/{task_config['name']}/ai/StartTrigger")
+        if(len(self.pattern_channels) == 1):
+            self.digital_pattern_task.write(self.pattern_buffer[0].tolist(), auto_start=False)
+        else:
+            self.digital_pattern_task.write(self.pattern_buffer.tolist(), auto_start=False)
+        self.no_digital_pattern = False
+
+    def build_analog_output_task(self, task_config):
+        import nidaqmx
+        self.no_analog_out = True
+        self.analog_outputs = {}
+        self.analog_output_channels = []
+        self.written_analog_outputs = None
+        if(self.analog_output_task):
+            self.analog_output_task.close()
+            self.analog_output_task = None
+        if(not task_config['channels']):
+            return
+        self.analog_output_task = nidaqmx.Task()
+        for channel, settings in task_config['channels'].items():
+            self.analog_outputs[channel] = settings['value']
+            self.analog_output_channels.append(channel)
+            self.analog_output_task.ao_channels.add_ao_voltage_chan(make_daq_name(task_config['name'], channel), min_val=settings['range'][0], max_val=settings['range'][1])
+        self.no_analog_out = False
+
+    def build_analog_waveform_task(self, task_config):
+        #the waveform is written once and regenerated from the device's onboard buffer
+        import nidaqmx
+        from nidaqmx.constants import AcquisitionType
+        self.no_analog_waveform = True
+        self.waveform_channels = []
+        self.waveform_buffer = None
+        if(self.analog_waveform_task):
+            self.analog_waveform_task.close()
+            self.analog_waveform_task = None
+        if(not task_config['channels']):
+            return
+        self.waveform_rate = task_config['rate']
+        self.waveform_buffer = make_waveform_buffer(list(task_config['channels'].values()), self.waveform_rate)
+        self.analog_waveform_task = nidaqmx.Task()
+        for channel, settings in task_config['channels'].items():
+            self.analog_waveform_task.ao_channels.add_ao_voltage_chan(make_daq_name(task_config['name'], channel), min_val=settings['range'][0], max_val=settings['range'][1])
+            self.waveform_channels.append(channel)
+        self.analog_waveform_task.timing.cfg_samp_clk_timing(rate = self.waveform_rate, sample_mode=AcquisitionType.CONTINUOUS, samps_per_chan=self.waveform_buffer.shape[1])
+        if(task_config['triggered']):
+            self.analog_waveform_task.triggers.start_trigger.cfg_dig_edge_start_trig(f"/{task_config['name']}/ai/StartTrigger")
+        if(len(self.waveform_channels) == 1):
+            self.analog_waveform_task.write(self.waveform_buffer[0], auto_start=False)
+        else:
+            self.analog_waveform_task.write(self.waveform_buffer, auto_start=False)
+        self.no_analog_waveform = False
+
+    def set_digital_output(self, channel, value):
+        #written on the next read_block or set_outputs call
+        self.user_inputs[channel] = value
+
+    def set_analog_output(self, channel, value):
+        #written on the next read_block or set_outputs call
+        self.analog_outputs[channel] = value
+
+# === Acquisition Session ===
+class AcquisitionSession:
+    """Asyncio interface to one DAQ device.
+
+        async with AcquisitionSession(config) as session:
+            await session.write_output('port0/line0', 1)
+            async for block in session.stream():
+                ...
+
+    Blocking driver calls run in the event loop's executor rather than on a
+    thread of their own, and the calls of one session are serialized so
+    several devices can share one loop and executor. rule_callback is
+    called on the event loop with (output channel, new value, latency in s).
+    """
+    def __init__(self, config: dict = None, executor=None, rule_callback=None):
+        self.tasks = DAQTasks()
+        self.tasks.rule_callback = self.dispatch_rule
+        self.rule_callback = rule_callback
+        self.config = config
+        self.executor = executor # None uses the loop's default executor
+        self.loop = None
+        self.lock = None # created on first use so it belongs to the running loop
+        self.running = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def run_blocking(self, function, *args):
+        if(self.lock is None):
+            self.lock = asyncio.Lock()
+        self.loop = asyncio.get_running_loop()
+        async with self.lock:
+            return await self.loop.run_in_executor(self.executor, functools.partial(function, *args))
+
+    def dispatch_rule(self, *args):
+        #rules are evaluated in read_block on an executor thread
+        if(self.rule_callback):
+            self.loop.call_soon_threadsafe(self.rule_callback, *args)
+
+    async def configure(self, config: dict):
+        config = normalize_config(copy.deepcopy(config))
+        await self.run_blocking(self.tasks.update_config, config)
+        self.config = config
+
+    async def set_rules(self, rules_config: list):
+        await self.run_blocking(self.tasks.set_rules, rules_config)
+
+    async def start(self):
+        if(self.config is None):
+            raise ValueError("AcquisitionSession needs a config before it is started")
+        if(not self.tasks.task_configs):
+            await self.configure(self.config)
+            await self.set_rules(self.config.get('rules', []))
+        await self.run_blocking(self.tasks.start)
+        self.running = True
+
+    async def stop(self):
+        self.running = False
+        await self.run_blocking(self.tasks.stop)
+
+    async def close(self):
+        await self.stop()
+        await self.run_blocking(self.tasks.close)
+
+    async def write_output(self, channel: str, value):
+        """Sets a digital output (0/1) or a static analog output (V)."""
+        if(channel in self.tasks.user_inputs):
+            set_output = self.tasks.set_digital_output
+        elif(channel in self.tasks.analog_outputs):
+            set_output, value = self.tasks.set_analog_output, float(value)
+        else:
+            raise KeyError(f"{channel} is not a digital or static analog output")
+        #under the lock, so a read_block running in the executor never sees a half applied write
+        await self.run_blocking(self.write_output_blocking, set_output, channel, value)
+
+    def write_output_blocking(self, set_output, channel, value):
+        set_output(channel, value)
+        self.tasks.set_outputs()
+
+    async def stream(self):
+        """Yields blocks {'timestamp': [...], channel: [...]} until stop() is called."""
+        while self.running:
+            block = await self.run_blocking(self.tasks.read_block)
+            if(block):
+                yield block
+            await asyncio.sleep(self.tasks.poll_interval)
@@ -0,0 +1,281 @@
+import os
+import io
+import re
+import sys
+import json
+import mmap
+import warnings
+import argparse
+import numpy as np
+
+# Recordings are indexed in chunks of rows. The index is saved next to the
+# recording and holds the byte offset, time span and per-column min/max of
+# every chunk, so queries only read the chunks they need.
+
+INDEX_CHUNK_ROWS = 4096
+INDEX_SUFFIX = '.idx.npz'
+
+# === parsing functions ===
+
+def parse_rows(data: bytes, num_columns: int):
+    """Rows of a recording as a float array. Digital True/False become 1/0 and empty cells NaN."""
+    if(not data.strip()):
+        return np.empty((0, num_columns))
+    data = data.replace(b'True', b'1').replace(b'False', b'0')
+    try:
+        rows = np.loadtxt(io.BytesIO(data), delimiter=',', dtype=float, comments='#')
+    except ValueError:
+        #slower parser that accepts empty cells
+        rows = np.genfromtxt(io.BytesIO(data), delimiter=',', dtype=float, comments='#')
+    return rows.reshape(-1, num_columns)
+
+def read_header(file):
+    """Column names and the byte offset of the first data row. Lines starting with # are skipped."""
+    offset = 0
+    for line in file:
+        offset += len(line)
+        if(not line.startswith(b'#')):
+            return line.decode().strip().split(','), offset
+    raise ValueError("Recording has no header")
+
+def read_units(recording_path: str) -> dict:
+    """{column: units} from the #units line the GUI writes above the header, empty for older recordings."""
+    units = None
+    with open(recording_path, 'rb') as f:
+        for line in f:
+            if(line.startswith(b'#units,')):
+                units = line.decode().strip().split(',')[1:]
+            elif(not line.startswith(b'#')):
+                return dict(zip(line.decode().strip().split(','), units)) if units else {}
+    return {}
+
+def index_path(recording_path: str) -> str:
+    return recording_path + INDEX_SUFFIX
+
+def config_path(recording_path: str) -> str:
+    #written by the GUI when a recording starts, shared by the files of slower rate groups (session.10Hz.csv)
+    base = re.sub(r'\.[0-9.e+-]+Hz$', '', os.path.splitext(recording_path)[0])
+    return base + '.config.json'
+
+def load_config(recording_path: str):
+    """The config a recording was made with, or None for recordings without one."""
+    try:
+        with open(config_path(recording_path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# === index functions ===
+
+def build_index(recording_path: str, chunk_rows: int = INDEX_CHUNK_ROWS) -> dict:
+    offsets = []
+    row_counts = []
+    minimums = []
+    maximums = []
+    with open(recording_path, 'rb') as f:
+        columns, offset = read_header(f)
+        chunk = []
+        chunk_offset = offset
+        for line in f:
+            chunk.append(line)
+            offset += len(line)
+            if(len(chunk) == chunk_rows):
+                add_chunk(b''.join(chunk), chunk_offset, columns, offsets, row_counts, minimums, maximums)
+                chunk = []
+                chunk_offset = offset
+        if(chunk):
+            add_chunk(b''.join(chunk), chunk_offset, columns, offsets, row_counts, minimums, maximums)
+    offsets.append(offset)
+    stat = os.stat(recording_path)
+    index = {
+        'columns': np.array(columns),
+        'offsets': np.array(offsets, dtype=np.int64),
+        'row_counts': np.array(row_counts, dtype=np.int64),
+        'minimums': np.array(minimums).reshape(-1, len(columns)),
+        'maximums': np.array(maximums).reshape(-1, len(columns)),
+        'source_size': np.int64(stat.st_size),
+        'source_mtime': np.float64(stat.st_mtime)
+    }
+    np.savez(index_path(recording_path), **index)
+    return index
+
+def add_chunk(data, chunk_offset, columns, offsets, row_counts, minimums, maximums):
+    rows = parse_rows(data, len(columns))
+    offsets.append(chunk_offset)
+    row_counts.append(len(rows))
+    #empty cells are NaN and do not count towards the chunk range
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        minimums.append(np.nanmin(rows, axis=0) if len(rows) else np.full(len(columns), np.nan))
+        maximums.append(np.nanmax(rows, axis=0) if len(rows) else np.full(len(columns), np.nan))
+
+def load_index(recording_path: str) -> dict:
+    """The saved index of a recording, rebuilt if it is missing or older than the recording."""
+    try:
+        with np.load(index_path(recording_path)) as saved:
+            index = {key: saved[key] for key in saved.files}
+        stat = os.stat(recording_path)
+        if(index['source_size'] == stat.st_size and index['source_mtime'] == stat.st_mtime):
+            return index
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_index(recording_path)
+
+# === Recording ===
+
+class Recording:
+    """Time range and channel queries over a recorded .csv file without loading all of it.
+
+    The file is memory mapped and only the chunks that overlap the requested
+    time range are parsed. Timestamps must increase through the file, as they
+    do in recordings made by the GUI.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.index = load_index(path)
+        self.columns = [str(column) for column in self.index['columns']]
+        self.units = read_units(path)
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b''
+        #time span of each chunk, from the timestamp column of the index
+        self.chunk_starts = self.index['minimums'][:, 0]
+        self.chunk_ends = self.index['maximums'][:, 0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if(isinstance(self.map, mmap.mmap)):
+            self.map.close()
+        self.file.close()
+
+    @property
+    def channels(self) -> list:
+        return self.columns[1:]
+
+    @property
+    def duration(self) -> float:
+        if(len(self.chunk_starts) == 0):
+            return 0.0
+        return float(self.chunk_ends[-1] - self.chunk_starts[0])
+
+    def chunks_in_range(self, start=None, end=None):
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        return np.flatnonzero((self.chunk_ends >= start) & (self.chunk_starts <= end))
+
+    def read_chunks(self, chunks):
+        if(len(chunks) == 0):
+            return np.empty((0, len(self.columns)))
+        #neighbouring chunks are contiguous in the file, so runs are read in one slice
+        rows = []
+        run_start = chunks[0]
+        for i in range(1, len(chunks) + 1):
+            if(i == len(chunks) or chunks[i] != chunks[i - 1] + 1):
+                data = self.map[self.index['offsets'][run_start]:self.index['offsets'][chunks[i - 1] + 1]]
+                rows.append(parse_rows(data, len(self.columns)))
+                if(i < len(chunks)):
+                    run_start = chunks[i]
+        return np.concatenate(rows)
+
+    def column_indices(self, channels):
+        if(channels is None):
+            return list(range(1, len(self.columns)))
+        try:
+            return [self.columns.index(channel) for channel in channels]
+        except ValueError:
+            raise KeyError(f"Channels not in recording: {[ch for ch in channels if ch not in self.columns]}")
+
+    def query(self, start=None, end=None, channels=None) -> dict:
+        """Samples between start and end (s) as {'timestamp': array, channel: array}."""
+        indices = self.column_indices(channels)
+        rows = self.read_chunks(self.chunks_in_range(start, end))
+        keep = np.ones(len(rows), dtype=bool)
+        if(start is not None):
+            keep &= rows[:, 0] >= start
+        if(end is not None):
+            keep &= rows[:, 0] <= end
+        rows = rows[keep]
+        result = {'timestamp': rows[:, 0]}
+        for i in indices:
+            result[self.columns[i]] = rows[:, i]
+        return result
+
+    def min_max(self, start=None, end=None, channels=None) -> dict:
+        """{channel: (min, max)} between start and end (s).
+
+        Chunks entirely inside the range are answered from the index, so only
+        the chunks at the two ends of the range are read.
+        """
+        indices = self.column_indices(channels)
+        chunks = self.chunks_in_range(start, end)
+        inside = np.ones(len(chunks), dtype=bool)
+        if(start is not None):
+            inside &= self.chunk_starts[chunks] >= start
+        if(end is not None):
+            inside &= self.chunk_ends[chunks] <= end
+        minimums = [self.index['minimums'][chunks[inside]][:, indices]]
+        maximums = [self.index['maximums'][chunks[inside]][:, indices]]
+        edge_rows = self.read_chunks(chunks[~inside])
+        keep = np.ones(len(edge_rows), dtype=bool)
+        if(start is not None):
+            keep &= edge_rows[:, 0] >= start
+        if(end is not None):
+            keep &= edge_rows[:, 0] <= end
+        minimums.append(edge_rows[keep][:, indices])
+        maximums.append(edge_rows[keep][:, indices])
+        minimums = np.concatenate(minimums)
+        maximums = np.concatenate(maximums)
+        if(len(minimums) == 0):
+            return {self.columns[i]: (np.nan, np.nan) for i in indices}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            minimum = np.nanmin(minimums, axis=0)
+            maximum = np.nanmax(maximums, axis=0)
+        return {self.columns[i]: (float(minimum[j]), float(maximum[j])) for j, i in enumerate(indices)}
+
+# === command line ===
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index and query recordings made by the NI DAQ GUI.")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    index_parser = subparsers.add_parser('index', help="build the index of one or more recordings")
+    index_parser.add_argument('recordings', nargs='+')
+    index_parser.add_argument('--chunk-rows', type=int, default=INDEX_CHUNK_ROWS)
+    for name, help_text in (('query', "write the samples in a time range to a .csv file"), ('range', "print the min and max of each channel in a time range")):
+        query_parser = subparsers.add_parser(name, help=help_text)
+        query_parser.add_argument('recording')
+        query_parser.add_argument('--start', type=float, default=None, help="start time (s)")
+        query_parser.add_argument('--end', type=float, default=None, help="end time (s)")
+        query_parser.add_argument('--channels', nargs='+', default=None)
+        if(name == 'query'):
+            query_parser.add_argument('--out', default=None, help="output .csv file, printed if not given")
+    args = parser.parse_args(argv)
+
+    if(args.command == 'index'):
+        for recording in args.recordings:
+            index = build_index(recording, args.chunk_rows)
+            print(f"{recording}: {int(index['row_counts'].sum())} rows in {len(index['row_counts'])} chunks")
+        return 0
+    with Recording(args.recording) as recording:
+        if(args.command == 'range'):
+            for channel, (low, high) in recording.min_max(args.start, args.end, args.channels).items():
+                print(f"{channel}: {low} to {high} {recording.units.get(channel, '')}".rstrip())
+            return 0
+        result = recording.query(args.start, args.end, args.channels)
+        columns = list(result.keys())
+        out = open(args.out, 'w', newline='') if args.out else sys.stdout
+        try:
+            out.write(','.join(columns) + '\n')
+            np.savetxt(out, np.column_stack([result[column] for column in columns]), delimiter=',', fmt='%.10g')
+        finally:
+            if(args.out):
+                out.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
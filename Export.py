@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import concurrent.futures
+import numpy as np
+
+from Analysis import read_header, read_units, parse_rows, load_config
+
+# Converts recordings to columnar files. Each file is streamed in chunks of
+# rows, and files are converted in parallel, one per worker process.
+
+EXPORT_CHUNK_ROWS = 65536
+EXPORT_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+    'npz': '.npz'
+}
+
+# === reading functions ===
+
+def read_chunks(recording_path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yields the column names, then each chunk of rows as a float array."""
+    with open(recording_path, 'rb') as f:
+        columns, _ = read_header(f)
+        yield columns
+        chunk = []
+        for line in f:
+            chunk.append(line)
+            if(len(chunk) == chunk_rows):
+                yield parse_rows(b''.join(chunk), len(columns))
+                chunk = []
+        if(chunk):
+            yield parse_rows(b''.join(chunk), len(columns))
+
+def digital_columns(columns: list, config) -> set:
+    #without a saved config, digital lines are recognised by their NI channel names
+    if(config):
+        return {column for column in columns if column in config['digital']}
+    return {column for column in columns if '/line' in column}
+
+# === export functions ===
+
+def export_recording(recording_path: str, out_dir: str, export_format: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Converts one recording and returns (output path, rows, seconds)."""
+    start_time = time.perf_counter()
+    config = load_config(recording_path)
+    name = os.path.splitext(os.path.basename(recording_path))[0]
+    out_path = os.path.join(out_dir or os.path.dirname(recording_path), name + EXPORT_FORMATS[export_format])
+    chunks = read_chunks(recording_path, chunk_rows)
+    columns = next(chunks)
+    digital = digital_columns(columns, config)
+    metadata = {'source': os.path.basename(recording_path), 'config': config, 'units': read_units(recording_path)}
+    if(export_format == 'npz'):
+        rows = export_npz(chunks, columns, digital, metadata, out_path)
+    else:
+        rows = export_arrow(chunks, columns, digital, metadata, out_path, export_format)
+    return out_path, rows, time.perf_counter() - start_time
+
+def export_arrow(chunks, columns, digital, metadata, out_path, export_format):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.ipc
+    except ImportError:
+        raise RuntimeError("pyarrow is needed for Parquet and Arrow export, use --format npz without it")
+    fields = [pa.field(column, pa.bool_() if column in digital else pa.float64()) for column in columns]
+    schema = pa.schema(fields, metadata={'recording': json.dumps(metadata)})
+    if(export_format == 'parquet'):
+        writer = pq.ParquetWriter(out_path, schema)
+    else:
+        writer = pa.ipc.new_file(out_path, schema)
+    rows = 0
+    try:
+        for chunk in chunks:
+            arrays = []
+            for i, column in enumerate(columns):
+                #empty cells become nulls
+                missing = np.isnan(chunk[:, i])
+                values = chunk[:, i] == 1 if column in digital else chunk[:, i]
+                arrays.append(pa.array(values, mask=missing if missing.any() else None))
+            batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            if(export_format == 'parquet'):
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+def export_npz(chunks, columns, digital, metadata, out_path):
+    #npz files are written in one go, so the typed columns are collected first
+    parts = {column: [] for column in columns}
+    for chunk in chunks:
+        for i, column in enumerate(columns):
+            parts[column].append(chunk[:, i] == 1 if column in digital else chunk[:, i])
+    arrays = {column: np.concatenate(values) if values else np.empty(0, dtype=bool if column in digital else float) for column, values in parts.items()}
+    #channel names contain '/', which npz would treat as folders
+    np.savez_compressed(out_path, columns=np.array(columns), metadata=np.array(json.dumps(metadata)), **{f"column_{i}": arrays[column] for i, column in enumerate(columns)})
+    return len(arrays[columns[0]])
+
+def export_recordings(recording_paths: list, out_dir: str, export_format: str, jobs=None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Converts recordings in parallel. Yields (recording, result or exception) as each finishes."""
+    if(out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(export_recording, path, out_dir, export_format, chunk_rows): path for path in recording_paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+# === command line ===
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert recordings made by the NI DAQ GUI to columnar files.")
+    parser.add_argument('recordings', nargs='+', help=".csv recordings, wildcards are allowed")
+    parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS.keys()), default='parquet')
+    parser.add_argument('--out-dir', default=None, help="folder for the converted files, next to each recording if not given")
+    parser.add_argument('--jobs', type=int, default=None, help="number of worker processes, one per core if not given")
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    recording_paths = []
+    for pattern in args.recordings:
+        recording_paths += sorted(glob.glob(pattern)) or [pattern]
+    start_time = time.perf_counter()
+    failures = 0
+    for path, result in export_recordings(recording_paths, args.out_dir, args.export_format, args.jobs, args.chunk_rows):
+        if(isinstance(result, Exception)):
+            failures += 1
+            print(f"{path}: failed: {result}", file=sys.stderr)
+        else:
+            out_path, rows, seconds = result
+            print(f"{path} -> {out_path}: {rows} rows in {seconds:.1f}s")
+    print(f"Converted {len(recording_paths) - failures} of {len(recording_paths)} recordings in {time.perf_counter() - start_time:.1f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,33 @@
-import sys
 import time
+import_start_time = time.perf_counter() # before the other imports, so they count towards the startup time
+import os
+import sys
 import queue
 import csv
 from PyQt5.QtWidgets import QApplication, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QComboBox, QPushButton, QFileDialog, QMessageBox, QGroupBox, QGridLayout, QDialog, QDialogButtonBox, QLineEdit
 from PyQt5.QtCore import QThread, QTimer, pyqtSignal, pyqtSlot, Qt
-import pyqtgraph as pg
 import threading
 import json
-
-from nidaqmx.system import System
-import nidaqmx
-from nidaqmx.constants import AcquisitionType
-from nidaqmx.constants import TerminalConfiguration
+import copy
+import math
+
+from Acquisition import DAQTasks, AcquisitionError, null_config, normalize_config, make_default_config, input_buffer_config, split_rules, waveform_errors, calibration_errors, output_controls_config, plot_config, recorded_channels, rate_groups, channel_rates, channel_units, group_path
+
+# nidaqmx and pyqtgraph are slow to import, so they are imported where they are
+# first used. This keeps startup fast and lets the classes be imported by scripts.
+
+STARTUP_TIME_BUDGET = 1.5 # seconds from import until the window is first drawn
+CONFIG_DEBOUNCE_MS = 250 # quiet time after the last config edit before it is applied
+PLOT_DRAIN_INTERVAL_MS = 20 # how often plot data is taken off the queue
+MIN_FRAME_INTERVAL = 0.02 # seconds between plot redraws when drawing is fast
+MAX_FRAME_INTERVAL = 0.5 # seconds between plot redraws when drawing is slow
+FRAME_BUDGET = 0.5 # fraction of the frame interval a redraw may take before backing off
+HISTORY_LEVELS = [1.0, 10.0, 60.0] # seconds per bucket of each session history resolution
+HISTORY_BUCKETS = 3600 # buckets kept per resolution, so 1 hour of 1s buckets and 60 hours of 1min buckets
+HISTORY_MAX_POINTS = 2000 # most buckets drawn per channel in the history plot
+HISTORY_REFRESH_INTERVAL = 1.0 # seconds between history plot redraws
+JOURNAL_COMMIT_INTERVAL = 0.01 # seconds between journal syncs, at most this much recorded data is lost in a crash
+RECORDING_FORMATS = {'CSV': "CSV Files (*.csv)", 'Journal': "Journal Files (*.journal)"} # format -> save dialog filter
 
 # === general functions ===
 
@@ -27,218 +43,191 @@ def clear_layout(layout):
                 if sub_layout is not None:
                     clear_layout(sub_layout)
 
-# ===DAQ general functions===  
-def get_system_name_from_daq_name(daq_name: str) -> str:
-    if '/' not in daq_name:
-        raise ValueError(f"Invalid channel string: {daq_name}")
-    return daq_name.split('/', 1)[1]
-
-def make_daq_name(dev_name:str, ch_name:str) -> str:
-    return f"{dev_name}/{ch_name}"
-
-def null_config():
-    return {
-        'device': {
-            'model': None, 
-            'name': None, 
-            'sample_rate': None
-            },
-        'analog': {},
-        'digital': {}
-    }
-
-def make_default_config(name: str) -> dict:
-    system = System.local()
-    dev = system.devices[name]
-    config = {'device':{'model': dev.product_type, 'name': dev.name, 'sample_rate': 10}, 'analog':{}, 'digital':{}}
-    #detect analog channels
-    for ai_channel in list(dev.ai_physical_chans):
-        config['analog'][get_system_name_from_daq_name(ai_channel.name)] = {'enabled': False, 'mode': ai_channel.ai_term_cfgs[0].name, 'modes': [ch.name for ch in ai_channel.ai_term_cfgs]}
-    #detect digital channels
-    for digital_input_channel in dev.di_lines:
-        config['digital'][get_system_name_from_daq_name(digital_input_channel.name)] = {'enabled': False, 'mode': 'Input', 'modes': ['Input']}
-    for digital_output_channel in dev.do_lines:
-        if(digital_output_channel.name in [ch.name for ch in dev.di_lines]):
-            config['digital'][get_system_name_from_daq_name(digital_output_channel.name)]['modes'] = ["Input", "Output"]
-        else:
-            config['digital'][get_system_name_from_daq_name(digital_output_channel.name)] = {'enabled': False, 'mode': 'Output', 'modes': ['Output']}
-    return config
-    
-    
-
-
-
-
-# === DAQ Worker Thread (Dummy Data Generator) ===
+# ===Session history===
+class HistoryLevel:
+    """Min/max of each channel over fixed-width time buckets, kept in a ring of HISTORY_BUCKETS."""
+    def __init__(self, width: float, num_channels: int):
+        import numpy as np
+        self.width = width
+        self.times = np.zeros(HISTORY_BUCKETS)
+        self.minimums = np.zeros((HISTORY_BUCKETS, num_channels))
+        self.maximums = np.zeros((HISTORY_BUCKETS, num_channels))
+        self.count = 0 # buckets ever closed, the newest is at (count - 1) % HISTORY_BUCKETS
+        self.open_bucket = None # (bucket number, minimums, maximums) still receiving samples
+
+    def add(self, timestamps, values):
+        import numpy as np
+        buckets = np.floor(timestamps / self.width).astype(np.int64)
+        #timestamps increase, so each bucket is one contiguous segment of the block
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        #channels at a lower rate are NaN between their samples and are skipped
+        minimums = np.fmin.reduceat(values, starts, axis=0)
+        maximums = np.fmax.reduceat(values, starts, axis=0)
+        for bucket, minimum, maximum in zip(buckets[starts], minimums, maximums):
+            if(self.open_bucket is not None and self.open_bucket[0] == bucket):
+                self.open_bucket = (bucket, np.fmin(self.open_bucket[1], minimum), np.fmax(self.open_bucket[2], maximum))
+                continue
+            if(self.open_bucket is not None):
+                self.close_bucket()
+            self.open_bucket = (bucket, minimum, maximum)
+
+    def close_bucket(self):
+        bucket, minimum, maximum = self.open_bucket
+        position = self.count % HISTORY_BUCKETS
+        self.times[position] = bucket * self.width
+        self.minimums[position] = minimum
+        self.maximums[position] = maximum
+        self.count = self.count + 1
+
+    def buckets(self):
+        """Bucket start times, minimums and maximums in time order, including the open bucket."""
+        import numpy as np
+        kept = min(self.count, HISTORY_BUCKETS)
+        order = (np.arange(self.count - kept, self.count)) % HISTORY_BUCKETS
+        times, minimums, maximums = self.times[order], self.minimums[order], self.maximums[order]
+        if(self.open_bucket is not None):
+            times = np.append(times, self.open_bucket[0] * self.width)
+            minimums = np.vstack([minimums, self.open_bucket[1]])
+            maximums = np.vstack([maximums, self.open_bucket[2]])
+        return times, minimums, maximums
+
+class SessionHistory:
+    """Multi-resolution min/max history of a whole session with bounded memory.
+
+    Every block of samples updates each resolution in HISTORY_LEVELS. view()
+    returns the finest resolution that still covers the requested time range
+    in at most max_points buckets.
+    """
+    def __init__(self, channels: list):
+        self.channels = list(channels)
+        self.levels = [HistoryLevel(width, len(self.channels)) for width in HISTORY_LEVELS]
+
+    def add(self, timestamps, values):
+        import numpy as np
+        if(len(timestamps) == 0 or not self.channels):
+            return
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.asarray(values, dtype=float).reshape(len(timestamps), len(self.channels))
+        for level in self.levels:
+            level.add(timestamps, values)
+
+    def view(self, start=None, end=None, max_points=HISTORY_MAX_POINTS):
+        import numpy as np
+        for level in self.levels:
+            times, minimums, maximums = level.buckets()
+            if(len(times) == 0):
+                return times, minimums, maximums
+            #a level is only usable if it still holds the start of the range
+            covers_start = start is None and level.count <= HISTORY_BUCKETS or start is not None and times[0] <= start
+            in_range = np.ones(len(times), dtype=bool)
+            if(start is not None):
+                in_range &= times + level.width >= start
+            if(end is not None):
+                in_range &= times <= end
+            if(covers_start and np.count_nonzero(in_range) <= max_points or level is self.levels[-1]):
+                return times[in_range], minimums[in_range], maximums[in_range]
+
+    def add_reduced(self, reduced):
+        """Adds a block from reduce_block(), each bucket as its minimum and maximum at its first timestamp."""
+        import numpy as np
+        times = np.repeat(reduced['timestamp'], 2)
+        values = np.full((len(times), len(self.channels)), np.nan)
+        for i, channel in enumerate(self.channels):
+            if(channel in reduced):
+                values[0::2, i], values[1::2, i] = reduced[channel]
+        self.add(times, values)
+
+def reduce_block(block: dict, width: float = HISTORY_LEVELS[0]) -> dict:
+    """Min/max of every channel of a block over width second buckets, as {'timestamp': times, channel: (minimums, maximums)}.
+
+    Every history level is a multiple of the finest one, so adding the
+    reduced block gives the same history as adding every sample.
+    """
+    import numpy as np
+    timestamps = np.asarray(block['timestamp'], dtype=float)
+    buckets = np.floor(timestamps / width).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    reduced = {'timestamp': timestamps[starts]}
+    for channel, values in block.items():
+        if(channel != 'timestamp'):
+            #None marks the samples a slower channel does not have
+            values = np.array(values, dtype=float)
+            reduced[channel] = (np.fmin.reduceat(values, starts), np.fmax.reduceat(values, starts))
+    return reduced
+
+# === DAQ Worker Thread ===
 class DAQWorker(QThread):
     configuration_exception = pyqtSignal(str) 
-    def __init__(self, plot_queue, record_queue, record_flag):
+    acquisition_exception = pyqtSignal(str) # samples were lost, the config is kept
+    rules_exception = pyqtSignal(str) # the rules were not applied, the rest of the config is kept
+    rule_triggered = pyqtSignal(str, int, float) # output channel, new value, input to output latency (s)
+    def __init__(self, plot_queue, recorders, history_queue=None):
         super().__init__()
         self.plot_queue = plot_queue
-        self.record_queue = record_queue
-        self.record_flag = record_flag
-        self.sample_interval = None
-        self.user_input_channels = []
-        self.digital_channels = []
-        self.analog_channels = []
-        self.user_inputs = {}
+        self.history_queue = history_queue # min/max of every block for the session history, never skipped
+        self.recorders = recorders # RecordingWorkers, replaced as a whole when recorders are added or removed
+        self.tasks = DAQTasks()
+        self.tasks.rule_callback = self.rule_triggered.emit
         self.running = False
 
-        self.no_analog = True
-        self.no_digital_in = True
-        self.no_digital_out = True
-
-        self.analog_task = None
-        self.digital_input_task = None
-        self.digital_output_task = None
-
     def run(self):
         self.running = True
-        if(self.analog_task and not self.no_analog):
-            self.analog_task.start()
-        if(self.digital_input_task and not self.no_digital_in):
-            self.digital_input_task.start()
-        if(self.no_analog):
-            self.run_no_analog()
-        else:
-            self.run_analog_mode()
-
-    def run_analog_mode(self):
-        total_num_analog_samples = 0
         try:
+            self.tasks.start()
             while self.running:
-                analog_samples = self.analog_task.read(number_of_samples_per_channel=nidaqmx.constants.READ_ALL_AVAILABLE)
-                current_num_analog_samples = 0
-                if(analog_samples):
-                    try:
-                        current_num_analog_samples = len(analog_samples[0])
-                    except TypeError:
-                        current_num_analog_samples = 1
-                        analog_samples = [analog_samples]
-                analog_timestamps = [self.sample_interval * i for i in range(total_num_analog_samples, total_num_analog_samples + current_num_analog_samples)]
-                total_num_analog_samples =  total_num_analog_samples + current_num_analog_samples
-                if(current_num_analog_samples>0):
-                    if(self.no_digital_in):
-                        digital_samples = [[]]
-                    else:
-                        digital_sample = self.digital_input_task.read()
-                        try:
-                            digital_samples = [[sample] * current_num_analog_samples for sample in digital_sample]
-                        except TypeError:
-                            digital_samples = [[digital_sample]]
-                    user_data = [[self.user_inputs[channel]] * current_num_analog_samples for channel in self.user_input_channels]
-                    self.queue_data(analog_timestamps, analog_samples, digital_samples, user_data)
-                self.set_outputs()
-                time.sleep(self.sample_interval/2)
+                block = self.tasks.read_block()
+                if(block):
+                    self.queue_data(block)
+                time.sleep(self.tasks.poll_interval)
+        except AcquisitionError as e:
+            self.acquisition_exception.emit(str(e))
         except:
             self.configuration_exception.emit("DAQ Encountered an Error")
 
-    def run_no_analog(self):
-        start_time = time.time()
-        while(self.running):
-            if(self.no_digital_in):
-                digital_samples = [[]]
-            else:
-                digital_sample = self.digital_input_task.read()
-                try:
-                    digital_samples = [[sample] for sample in digital_sample]
-                except TypeError:
-                    digital_samples = [[digital_sample]]
-            timestamp = [time.time() - start_time]
-            user_data = [[self.user_inputs[channel]] for channel in self.user_input_channels]
-            self.queue_data(timestamp, [[]], digital_samples, user_data)
-            self.set_outputs()
-            time.sleep(self.sample_interval)
-
-    def queue_data(self, time, analog, digital_in, digital_out):
-        num_packets = len(time)
-        packets = [{'timestamp':t} for t in time]
-        #format analog
-        for i in range(0, len(self.analog_channels)):
-            for j in range(0,num_packets):
-                packets[j][self.analog_channels[i]] = analog[i][j]
-        #format digital input
-        for i in range(0, len(self.digital_channels)):
-            for j in range(0,num_packets):
-                packets[j][self.digital_channels[i]] = digital_in[i][j]
-        #format digital output
-        for i in range(0, len(self.user_input_channels)):
-            for j in range(0,num_packets):
-                packets[j][self.user_input_channels[i]] = digital_out[i][j]
-        #load into queues
+    def queue_data(self, block):
+        #the session history must not miss peaks, so it gets every block before the plot queue can skip any
+        if(self.history_queue is not None and block['timestamp']):
+            self.history_queue.put_nowait(reduce_block(block))
+        #the plots and recorder take one packet per sample, channels at a lower rate are only in some packets
+        channels = list(block.keys())
+        packets = [{channel: value for channel, value in zip(channels, values) if value is not None} for values in zip(*block.values())]
+        #every active recorder gets the same packets, they are only read by the recorders
+        record_queues = [recorder.data_queue for recorder in self.recorders if recorder.active_flag.is_set()]
+        for record_queue in record_queues:
+            for packet in packets:
+                record_queue.put_nowait(packet)
+        #the plots skip samples they cannot keep up with
         for packet in packets:
-            if(self.record_flag.is_set()):
-                self.record_queue.put_nowait(packet)
-            self.plot_queue.put_nowait(packet)
-
-    def set_outputs(self):
-        if(not self.no_digital_out):
-            output_data = [self.user_inputs[channel] == 1 for channel in self.user_input_channels]
-            self.digital_output_task.write(output_data)
+            try:
+                self.plot_queue.put_nowait(packet)
+            except queue.Full:
+                break
 
     def stop(self):
         self.running = False
-        try:
-            if(self.analog_task):
-                self.analog_task.stop()
-            if(self.digital_input_task):
-                self.digital_input_task.stop()
-            if(self.digital_output_task):
-                self.digital_output_task.stop()
-        except:
-            self.analog_task = None
-            self.digital_input_task = None
-            self.digital_output_task = None
         self.wait()
+        self.tasks.stop()
+
+    def requires_restart(self, config):
+        return self.tasks.requires_restart(config)
 
     def update_config(self, config):
-        #analog input task
         try:
-            self.analog_channels = []
-            self.no_analog = True
-            if(self.analog_task):
-                self.analog_task.close()
-            self.analog_task = nidaqmx.Task()
-            for channel in config['analog'].keys():
-                if(config['analog'][channel]['enabled']):
-                    self.analog_task.ai_channels.add_ai_voltage_chan(make_daq_name(config['device']['name'], channel), terminal_config=TerminalConfiguration[config['analog'][channel]['mode']])
-                    self.no_analog = False
-                    self.analog_channels.append(channel)
-            if(not self.no_analog):
-                self.analog_task.timing.cfg_samp_clk_timing(rate = config['device']['sample_rate'], sample_mode=AcquisitionType.CONTINUOUS)
-            #digital input task
-            self.digital_channels = []
-            self.no_digital_in = True
-            if(self.digital_input_task):
-                self.digital_input_task.close()
-            self.digital_input_task = nidaqmx.Task()
-            for channel in config['digital'].keys():
-                if(config['digital'][channel]['enabled'] and config['digital'][channel]['mode'] == 'Input'):
-                    self.digital_input_task.di_channels.add_di_chan(make_daq_name(config['device']['name'], channel))
-                    self.no_digital_in = False
-                    self.digital_channels.append(channel)
-            #set sample rate
-            self.sample_interval = 1.0 / config['device']['sample_rate']
-            #digital output task
-            self.no_digital_out = True
-            self.user_inputs = {}
-            self.user_input_channels = []
-            if(self.digital_output_task):
-                self.digital_output_task.close()
-            self.digital_output_task = nidaqmx.Task()
-            for channel in config['digital'].keys():
-                if(config['digital'][channel]['enabled'] and config['digital'][channel]['mode'] == 'Output'):
-                    self.user_inputs[channel] = 0
-                    self.user_input_channels.append(channel)
-                    self.digital_output_task.do_channels.add_do_chan(make_daq_name(config['device']['name'], channel))
-                    self.no_digital_out = False
+            self.tasks.update_config(config)
         except:
             self.configuration_exception.emit("Error Configuring DAQ")
-    
-            
+
+    def set_rules(self, rules_config):
+        try:
+            self.tasks.set_rules(rules_config)
+        except Exception as e:
+            self.rules_exception.emit(f"Error Configuring Output Rules: {e}")
 
     def user_input(self, channel, value):
-        self.user_inputs[channel] = value  
+        self.tasks.set_digital_output(channel, value)
+
+    def analog_output_input(self, channel, value):
+        self.tasks.set_analog_output(channel, value)
 
 class DeviceSelectDialog(QDialog):
     def __init__(self, allowed_types=None, parent=None):
@@ -250,6 +239,7 @@ class DeviceSelectDialog(QDialog):
         # Device list
         self.combo = QComboBox()
         self.devices = []
+        from nidaqmx.system import System
         system = System.local()
         for dev in system.devices:
             if allowed_types is None or dev.product_type in allowed_types:
@@ -278,59 +268,163 @@ class DeviceSelectDialog(QDialog):
 
 # === Recording Worker Thread ===
 class RecordingWorker(QThread):
+    """One recorder. Records a subset of the channels, every sample or averaged over an interval."""
     file_exception = pyqtSignal(str)
-    def __init__(self, data_queue, active_flag):
+    def __init__(self, channels=None, interval=None):
         super().__init__()
-        self.data_queue = data_queue
-        self.active_flag = active_flag
+        #fed by DAQWorker.queue_data while active_flag is set
+        self.data_queue = queue.Queue()
+        self.active_flag = threading.Event()
+        self.channels = channels # channels to record, None for all
+        self.interval = interval # seconds per summary row, None records every sample
         self.running = False
-        self.file = None
-        self.writer = None
-        self.active_channels = []
-
-    def start_recording(self, filename):
+        self.files = [] # open .csv files and journals, closed when recording stops
+        self.writers = [] # (first channel of the rate group, csv writer or journal)
+        self.journals = []
+        self.last_commit_time = 0.0
+        self.active_groups = [] # [(rate, [channels])], fastest first
+        self.active_units = {} # channel -> units, written as a comment above the header
+        self.averaged_channels = set() # analog channels averaged in summary rows, others keep their last value
+        self.summary_window = None # interval number of the summary row being collected
+        self.summary = {} # channel -> sum of the analog channels or last value of the others
+        self.summary_counts = {} # analog channel -> samples in the sum
+
+    def start_recording(self, filename, config=None, recording_format='CSV') -> bool:
+        if(not self.active_groups):
+            self.file_exception.emit("None of the recorder's channels are enabled")
+            return False
+        #each rate group is stored at its own rate, the fastest in the chosen file and slower ones next to it
         try:
-            self.file = open(filename, 'w', newline='')
+            for i, (rate, channels) in enumerate(self.active_groups):
+                path = filename if i == 0 else group_path(filename, rate)
+                units = ['s'] + [self.active_units[channel] for channel in channels]
+                if(recording_format == 'Journal'):
+                    from Journal import JournalWriter
+                    writer = JournalWriter(path, ['timestamp'] + channels, units)
+                    self.files.append(writer)
+                    self.journals.append(writer)
+                else:
+                    file = open(path, 'w', newline='', encoding='utf-8')
+                    self.files.append(file)
+                    file.write('#units,' + ','.join(units) + '\n')
+                    writer = csv.DictWriter(file, fieldnames=['timestamp'] + channels, extrasaction='ignore')
+                    writer.writeheader()
+                self.writers.append((channels[0], writer))
+            #the config is saved next to the recording for analysis and export tools
+            if(config):
+                with open(os.path.splitext(filename)[0] + '.config.json', 'w') as f:
+                    json.dump(config, f, indent=4)
         except (OSError, IOError) as e:
             self.file_exception.emit(f"Error opening file: {e}")
-            return
-        data_fields = ['timestamp'] + self.active_channels
-        self.writer = csv.DictWriter(self.file, fieldnames=data_fields)
-        self.writer.writeheader()
+            self.close_files()
+            return False
+        self.summary_window = None
         self.running = True
         self.active_flag.set()
         self.start()
+        return True
 
     def run(self):
         while self.running:
             while not self.data_queue.empty():
                 sample = self.data_queue.get()
                 try:
-                    self.writer.writerow(sample)
+                    if(self.interval):
+                        self.summarize(sample)
+                    else:
+                        #all channels of a group are sampled together
+                        for channel, writer in self.writers:
+                            if(channel in sample):
+                                writer.writerow(sample)
                 except (OSError, IOError, ValueError) as e:
-                    self.file_exception.emit(f"Error writing to CSV file: {e}")
+                    self.file_exception.emit(f"Error writing to recording: {e}")
                     self.stop_recording()
                     return
+                #a recorder that falls behind never empties the queue, so journals are also committed while draining it
+                if(not self.commit_journals()):
+                    return
+            if(not self.commit_journals()):
+                return
             time.sleep(0.01)  # Prevent CPU hogging
 
+    def commit_journals(self) -> bool:
+        #journals are synced to disk in groups rather than per row
+        if(not self.journals or time.perf_counter() - self.last_commit_time < JOURNAL_COMMIT_INTERVAL):
+            return True
+        try:
+            for journal in self.journals:
+                journal.commit()
+        except (OSError, IOError) as e:
+            self.file_exception.emit(f"Error writing to journal: {e}")
+            self.stop_recording()
+            return False
+        self.last_commit_time = time.perf_counter()
+        return True
+
+    def summarize(self, sample):
+        #one row per interval, timestamped at the last sample it includes
+        window = math.floor(sample['timestamp'] / self.interval)
+        if(window != self.summary_window):
+            self.write_summary()
+            self.summary_window = window
+            self.summary = {}
+            self.summary_counts = {}
+        for channel, value in sample.items():
+            if(channel in self.averaged_channels):
+                self.summary[channel] = self.summary.get(channel, 0.0) + value
+                self.summary_counts[channel] = self.summary_counts.get(channel, 0) + 1
+            else:
+                self.summary[channel] = value
+
+    def write_summary(self):
+        if(not self.summary):
+            return
+        row = dict(self.summary)
+        for channel, count in self.summary_counts.items():
+            row[channel] = row[channel] / count
+        for channel, writer in self.writers:
+            writer.writerow(row)
+
     def stop_recording(self):
         self.running = False
         self.active_flag.clear()
         self.wait()
-        if self.file:
-            self.file.close()
-            self.file = None
+        #the last, partial interval of a summary is kept
+        if(self.interval and self.writers):
+            try:
+                self.write_summary()
+            except (OSError, IOError, ValueError) as e:
+                self.file_exception.emit(f"Error writing to recording: {e}")
+        self.summary = {}
+        self.close_files()
+
+    def close_files(self):
+        for file in self.files:
+            try:
+                file.close()
+            except (OSError, IOError) as e:
+                self.file_exception.emit(f"Error closing recording: {e}")
+        self.files = []
+        self.writers = []
+        self.journals = []
+
+    def recording_groups(self, config):
+        groups = [(rate, [channel for channel in channels if self.channels is None or channel in self.channels]) for rate, channels in rate_groups(config)]
+        groups = [(rate, channels) for rate, channels in groups if channels]
+        #a summary has one row per interval, so all of its channels go in one file
+        if(self.interval and groups):
+            return [(1.0 / self.interval, [channel for rate, channels in groups for channel in channels])]
+        return groups
+
+    def channels_changed(self, config):
+        return self.recording_groups(config) != self.active_groups or channel_units(config) != self.active_units
 
     def update_config(self, config):
         self.stop_recording()
         #update active channels
-        self.active_channels = []
-        for channel in config['analog'].keys():
-            if(config['analog'][channel]['enabled']):
-                self.active_channels.append(channel)
-        for channel in config['digital'].keys():
-            if(config['digital'][channel]['enabled']):
-                self.active_channels.append(channel)
+        self.active_groups = self.recording_groups(config)
+        self.active_units = channel_units(config)
+        self.averaged_channels = set(config['analog'].keys()) | set(config['analog_output'].keys())
 
 # === Config Tab (Placeholder) ===
 class ConfigTab(QWidget):
@@ -341,6 +435,12 @@ class ConfigTab(QWidget):
         super().__init__()
         self.config_data = config_data
 
+        #rapid edits (e.g. ticking many channels) are applied once they settle
+        self.config_timer = QTimer()
+        self.config_timer.setSingleShot(True)
+        self.config_timer.setInterval(CONFIG_DEBOUNCE_MS)
+        self.config_timer.timeout.connect(self.emit_config)
+
         layout = QVBoxLayout()
 
         top_group_layout = QVBoxLayout()
@@ -398,6 +498,14 @@ class ConfigTab(QWidget):
         
         digital_group.setLayout(self.digital_layout)
         layout.addWidget(digital_group, stretch=1)
+
+        # Analog Outputs Group
+        analog_output_group = QGroupBox("Analog Outputs")
+        self.analog_output_layout = QVBoxLayout()
+        self.analog_output_widgets = {}
+
+        analog_output_group.setLayout(self.analog_output_layout)
+        layout.addWidget(analog_output_group, stretch=1)
         self.setLayout(layout)
 
     def update_config(self):
@@ -412,8 +520,16 @@ class ConfigTab(QWidget):
         for channel_name in self.config_data['digital'].keys():
             self.config_data['digital'][channel_name]['enabled'] = self.digital_widgets[channel_name]['enable_cb'].isChecked()
             self.config_data['digital'][channel_name]['mode'] = self.digital_widgets[channel_name]['mode_cb'].currentText()
+
+        # Read analog output configurations
+        for channel_name in self.config_data['analog_output'].keys():
+            self.config_data['analog_output'][channel_name]['enabled'] = self.analog_output_widgets[channel_name]['enable_cb'].isChecked()
+            self.config_data['analog_output'][channel_name]['mode'] = self.analog_output_widgets[channel_name]['mode_cb'].currentText()
         
-        self.config_changed.emit(self.config_data)
+        self.config_timer.start()
+
+    def emit_config(self):
+        self.config_changed.emit(copy.deepcopy(self.config_data))
 
     def save_config(self):
         options = QFileDialog.Options()
@@ -431,13 +547,26 @@ class ConfigTab(QWidget):
         if filename:
             try:
                 with open(filename, 'r') as f:
-                    new_config = json.load(f)
+                    new_config = normalize_config(json.load(f))
+                    #a bad rule is left out rather than failing the whole config
+                    new_config['rules'], skipped = split_rules(new_config['rules'])
+                    #so is a bad calibration, the channel reads volts instead
+                    for channel, error in calibration_errors(new_config).items():
+                        new_config['analog'][channel]['calibration'] = None
+                        skipped.append(f"{channel} calibration: {error}")
+                    errors = waveform_errors(new_config)
+                    if(errors):
+                        raise ValueError("\n".join(errors))
+                    #raises ValueError for bad buffer overrides
+                    input_buffer_config(new_config)
                     device = self.select_device(new_config['device']['model'])
                     if(device):
                         new_config['device']['name'] = device['name']
                         new_config['device']['model'] = device['model']
                         self.config_data = new_config
                         self.update_ui_layout()
+                        if(skipped):
+                            QMessageBox.warning(self, "Config", "These entries were not loaded:\n" + "\n".join(skipped))
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load config: {e}")
 
@@ -447,12 +576,17 @@ class ConfigTab(QWidget):
         clear_layout(self.analog_layout)
         for channel_name in self.config_data['analog'].keys():
             layout = QHBoxLayout()
-            channel_widgets = {'enable_cb':QCheckBox(channel_name), 'mode_cb':QComboBox()}
+            channel_widgets = {'enable_cb':QCheckBox(channel_name), 'mode_cb':QComboBox(), 'rate_input':QLineEdit()}
             channel_widgets['mode_cb'].addItems(self.config_data['analog'][channel_name]['modes'])
             channel_widgets['mode_cb'].currentIndexChanged.connect(self.update_config)
             channel_widgets['enable_cb'].stateChanged.connect(self.update_config)
+            #empty means the device sample rate
+            channel_widgets['rate_input'].setPlaceholderText("Device rate")
+            channel_widgets['rate_input'].editingFinished.connect(lambda channel=channel_name: self.changed_channel_rate(channel))
             layout.addWidget(channel_widgets['enable_cb'])
             layout.addWidget(channel_widgets['mode_cb'])
+            layout.addWidget(channel_widgets['rate_input'])
+            layout.addWidget(QLabel("Hz"))
             self.analog_widgets[channel_name] = channel_widgets
             self.analog_layout.addLayout(layout)
 
@@ -469,6 +603,20 @@ class ConfigTab(QWidget):
             layout.addWidget(channel_widgets['mode_cb'])
             self.digital_widgets[channel_name] = channel_widgets
             self.digital_layout.addLayout(layout)
+
+        #Analog Output Widgets
+        self.analog_output_widgets = {}
+        clear_layout(self.analog_output_layout)
+        for channel_name in self.config_data['analog_output'].keys():
+            layout = QHBoxLayout()
+            channel_widgets = {'enable_cb':QCheckBox(channel_name), 'mode_cb':QComboBox()}
+            channel_widgets['mode_cb'].addItems(self.config_data['analog_output'][channel_name]['modes'])
+            channel_widgets['mode_cb'].currentIndexChanged.connect(self.update_config)
+            channel_widgets['enable_cb'].stateChanged.connect(self.update_config)
+            layout.addWidget(channel_widgets['enable_cb'])
+            layout.addWidget(channel_widgets['mode_cb'])
+            self.analog_output_widgets[channel_name] = channel_widgets
+            self.analog_output_layout.addLayout(layout)
         self.structure_changed.emit(self.config_data)
         self.apply_config_to_ui()
 
@@ -479,11 +627,18 @@ class ConfigTab(QWidget):
         for channel_name in self.config_data['analog'].keys():
             self.analog_widgets[channel_name]['enable_cb'].setChecked(self.config_data['analog'][channel_name]['enabled'])
             self.analog_widgets[channel_name]['mode_cb'].setCurrentText(self.config_data['analog'][channel_name]['mode'])
+            rate = self.config_data['analog'][channel_name]['rate']
+            self.analog_widgets[channel_name]['rate_input'].setText(f"{rate:g}" if rate else "")
 
         #Digital Widgets
         for channel_name in self.config_data['digital'].keys():
             self.digital_widgets[channel_name]['enable_cb'].setChecked(self.config_data['digital'][channel_name]['enabled'])
             self.digital_widgets[channel_name]['mode_cb'].setCurrentText(self.config_data['digital'][channel_name]['mode'])
+
+        #Analog Output Widgets
+        for channel_name in self.config_data['analog_output'].keys():
+            self.analog_output_widgets[channel_name]['enable_cb'].setChecked(self.config_data['analog_output'][channel_name]['enabled'])
+            self.analog_output_widgets[channel_name]['mode_cb'].setCurrentText(self.config_data['analog_output'][channel_name]['mode'])
         self.loading_flag = False
 
         #Top Widgets
@@ -539,6 +694,24 @@ class ConfigTab(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Invalid sample rate: {e}")
 
+    def changed_channel_rate(self, channel):
+        input_val = self.analog_widgets[channel]['rate_input'].text()
+        try:
+            value = None
+            if input_val:
+                value = float(input_val)
+                if(not value > 0):
+                    raise Exception("Sample rate must be above 0")
+            if(value == self.config_data['analog'][channel]['rate']):
+                return
+            self.config_data['analog'][channel]['rate'] = value
+            self.update_config()
+        except Exception as e:
+            #the box goes back to the rate in use
+            rate = self.config_data['analog'][channel]['rate']
+            self.analog_widgets[channel]['rate_input'].setText(f"{rate:g}" if rate else "")
+            QMessageBox.critical(self, "Error", f"Invalid sample rate for {channel}: {e}")
+
     def reset_config(self):
         if(self.config_data['device']['name']):
             self.config_data = make_default_config(self.config_data['device']['name'])
@@ -551,17 +724,23 @@ class ConfigTab(QWidget):
 
 # === Plots Tab with PyQtGraph ===
 class PlotsTab(QWidget):
-    def __init__(self, data_queue):
+    def __init__(self, data_queue, history_queue):
         super().__init__()
         self.data_queue = data_queue
+        self.history_queue = history_queue # blocks from reduce_block()
 
         self.max_time = 10
         self.max_points = 100
         self.x_data = []
         self.y_data = {}  # analog channel index -> list of samples
+        self.y_times = {} # analog channel index -> timestamps of its samples, channels may be slower than the device
+        self.channel_points = {} # analog channel index -> samples kept for the plot width
         self.bool_data = {} # digital channel index -> list of samples
         self.curves = {}  # analog channel index -> pg.PlotDataItem
         self.waveforms = {} # digital channel index -> pg.PlotDataItem
+        self.history = SessionHistory([]) # whole session of the analog channels
+        self.history_curves = {} # analog channel index -> pg.PlotDataItem
+        self.last_history_time = 0.0
 
         layout = QVBoxLayout()
         #plot width selection
@@ -576,6 +755,38 @@ class PlotsTab(QWidget):
         selection_layout.addWidget(self.width_selection_box)
         selection_layout.addWidget(width_unit)
         layout.addLayout(selection_layout)
+        #render options
+        render_layout = QHBoxLayout()
+        self.opengl_cb = QCheckBox("Use OpenGL")
+        self.opengl_cb.stateChanged.connect(self.opengl_changed)
+        self.frame_rate_text = QLabel()
+        self.frame_rate_text.setAlignment(Qt.AlignRight)
+        render_layout.addWidget(self.opengl_cb)
+        render_layout.addWidget(self.frame_rate_text)
+        layout.addLayout(render_layout)
+        #plots are created on first use so pyqtgraph is not imported at startup
+        self.plot_widget = None
+        self.digital_plot_widget = None
+        self.history_plot_widget = None
+        self.setLayout(layout)
+
+        self.active_channels = []  # list of analog channel indices
+        self.active_digital_channels = [] # list of digital channel indices
+
+        #data is drained on every tick, redraws are spaced by the adaptive frame interval
+        self.frame_interval = MIN_FRAME_INTERVAL
+        self.last_frame_time = 0.0
+        self.paint_time = 0.0 # seconds Qt spent painting the plots since the last redraw
+        self.needs_redraw = False
+        self.update_frame_rate_text()
+        self.plot_timer = QTimer()
+        self.plot_timer.timeout.connect(self.update_plot)
+        self.plot_timer.start(PLOT_DRAIN_INTERVAL_MS)
+
+    def create_plots(self):
+        if(self.plot_widget):
+            return
+        import pyqtgraph as pg
         #analog plot
         self.plot_widget = pg.PlotWidget(title="Live DAQ Analog Data")
         self.plot_widget.setLabel('left', 'Voltage', units='V')
@@ -584,19 +795,40 @@ class PlotsTab(QWidget):
         self.digital_plot_widget = pg.PlotWidget(title="Live DAQ Digital Data")
         self.digital_plot_widget.setLabel('left', 'Logic Value')
         self.digital_plot_widget.setLabel('bottom', 'Time', units='s')
-        layout.addWidget(self.plot_widget)
-        layout.addWidget(self.digital_plot_widget)
-        self.setLayout(layout)
-
-        self.active_channels = []  # list of analog channel indices
-        self.active_digital_channels = [] # list of digital channel indices
-
-        self.plot_timer = QTimer()
-        self.plot_timer.timeout.connect(self.update_plot)
-        self.plot_timer.start(20)  # update 20 Hz
+        #only draw what is in view, reduced to about one point per pixel
+        self.plot_widget.setClipToView(True)
+        self.plot_widget.setDownsampling(auto=True, mode='peak')
+        #session history plot, zooming or panning it shows finer detail
+        self.history_plot_widget = pg.PlotWidget(title="Session History (min/max)")
+        self.history_plot_widget.setLabel('left', 'Voltage', units='V')
+        self.history_plot_widget.setLabel('bottom', 'Session Time', units='s')
+        self.history_plot_widget.sigXRangeChanged.connect(self.history_range_changed)
+        self.layout().addWidget(self.plot_widget)
+        self.layout().addWidget(self.digital_plot_widget)
+        self.layout().addWidget(self.history_plot_widget)
+        for widget in (self.plot_widget, self.digital_plot_widget, self.history_plot_widget):
+            self.time_painting(widget)
+
+    def time_painting(self, widget):
+        #Qt paints in the event loop after draw_plots returns, so the paint time is collected here
+        paint_event = widget.paintEvent
+        def timed_paint_event(event):
+            start_time = time.perf_counter()
+            paint_event(event)
+            self.paint_time += time.perf_counter() - start_time
+        widget.paintEvent = timed_paint_event
+
+    def showEvent(self, event):
+        self.create_plots()
+        super().showEvent(event)
+        #catch up on data drained while hidden
+        if(self.needs_redraw):
+            self.draw_plots()
 
     def update_plot(self):
         updated = False
+        while not self.history_queue.empty():
+            self.history.add_reduced(self.history_queue.get())
         while not self.data_queue.empty():
             sample = self.data_queue.get()
             self.x_data.append(sample['timestamp'])
@@ -605,8 +837,7 @@ class PlotsTab(QWidget):
                 ch_name = ch_idx
                 if ch_name in sample:
                     self.y_data[ch_idx].append(sample[ch_name])
-                else:
-                    self.y_data[ch_idx].append(0)
+                    self.y_times[ch_idx].append(sample['timestamp'])
 
             for i in range(0,len(self.active_digital_channels)):
                 ch_idx = self.active_digital_channels[i]
@@ -621,45 +852,131 @@ class PlotsTab(QWidget):
         if updated:
             if len(self.x_data) > self.max_points:
                 self.x_data = self.x_data[-self.max_points:]
-                #truncate analog curve data
-                for ch_idx in self.active_channels:
-                    self.y_data[ch_idx] = self.y_data[ch_idx][-self.max_points:]
                 #truncate digital waveform data
                 for ch_idx in self.active_digital_channels:
                     self.bool_data[ch_idx] = self.bool_data[ch_idx][-self.max_points:]
+            #truncate analog curve data, each channel keeps the plot width at its own rate
+            for ch_idx in self.active_channels:
+                if len(self.y_data[ch_idx]) > self.channel_points[ch_idx]:
+                    self.y_data[ch_idx] = self.y_data[ch_idx][-self.channel_points[ch_idx]:]
+                    self.y_times[ch_idx] = self.y_times[ch_idx][-self.channel_points[ch_idx]:]
+            self.needs_redraw = True
+
+        #hidden plots keep their data but are not drawn
+        if(self.needs_redraw and self.isVisible() and time.perf_counter() - self.last_frame_time >= self.frame_interval):
+            self.draw_plots()
+
+    def draw_plots(self):
+        start_time = time.perf_counter()
+        self.needs_redraw = False
+        if self.x_data:
+            t0 = self.x_data[0]
+            x_shifted = [t - t0 for t in self.x_data]
+            #update analog curves
+            for ch_idx in self.active_channels:
+                self.curves[ch_idx].setData([t - t0 for t in self.y_times[ch_idx]], self.y_data[ch_idx])
+            #update digital waveforms
+            x_shifted.insert(0,x_shifted[0])
+            for ch_idx in self.active_digital_channels:
+                self.waveforms[ch_idx].setData(x_shifted, self.bool_data[ch_idx])
+        if(time.perf_counter() - self.last_history_time >= HISTORY_REFRESH_INTERVAL):
+            self.draw_history()
+        self.last_frame_time = time.perf_counter()
+        #the previous redraw was painted since then, so its paint time is counted with this one
+        self.adapt_frame_interval(self.last_frame_time - start_time + self.paint_time)
+        self.paint_time = 0.0
+
+    def draw_history(self):
+        import numpy as np
+        self.last_history_time = time.perf_counter()
+        view_box = self.history_plot_widget.getViewBox()
+        #follow the whole session until the user zooms or pans
+        if(view_box.autoRangeEnabled()[0]):
+            start, end = None, None
+        else:
+            start, end = view_box.viewRange()[0]
+        times, minimums, maximums = self.history.view(start, end)
+        #each bucket is drawn as a vertical line from its min to its max
+        x = np.repeat(times, 2)
+        for i, channel in enumerate(self.history.channels):
+            y = np.column_stack([minimums[:, i], maximums[:, i]]).ravel()
+            self.history_curves[channel].setData(x, y)
+
+    def history_range_changed(self):
+        #redraw at the resolution that suits the new range
+        if(self.isVisible() and time.perf_counter() - self.last_history_time >= MIN_FRAME_INTERVAL):
+            self.draw_history()
+
+    def reset_history(self):
+        self.history = SessionHistory(self.history.channels)
+        if(self.history_plot_widget):
+            self.history_plot_widget.enableAutoRange()
+
+    def adapt_frame_interval(self, frame_time):
+        #back off when redraws take too long, speed back up when they are cheap
+        if(frame_time > FRAME_BUDGET * self.frame_interval):
+            frame_interval = min(self.frame_interval * 2, MAX_FRAME_INTERVAL)
+        elif(frame_time < FRAME_BUDGET * self.frame_interval / 4):
+            frame_interval = max(self.frame_interval / 2, MIN_FRAME_INTERVAL)
+        else:
+            frame_interval = self.frame_interval
+        if(frame_interval != self.frame_interval):
+            self.frame_interval = frame_interval
+            self.update_frame_rate_text()
 
-            if self.x_data:
-                t0 = self.x_data[0]
-                x_shifted = [t - t0 for t in self.x_data]
-                #update analog curves
-                for ch_idx in self.active_channels:
-                    self.curves[ch_idx].setData(x_shifted, self.y_data[ch_idx])
-                #update digital waveforms
-                x_shifted.insert(0,x_shifted[0])
-                for ch_idx in self.active_digital_channels:
-                    self.waveforms[ch_idx].setData(x_shifted, self.bool_data[ch_idx])
-            
+    def update_frame_rate_text(self):
+        self.frame_rate_text.setText(f"Plot Refresh Rate: {1.0 / self.frame_interval:.0f}Hz")
+
+    def opengl_changed(self):
+        self.create_plots()
+        try:
+            self.plot_widget.useOpenGL(self.opengl_cb.isChecked())
+            self.digital_plot_widget.useOpenGL(self.opengl_cb.isChecked())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not change OpenGL rendering: {e}")
 
     def update_config(self, config):
+        import pyqtgraph as pg
+        self.create_plots()
         # === ANALOG ===
+        # analog outputs are plotted with the analog inputs
+        analog_channels = [channel for channel in config['analog'].keys() if config['analog'][channel]['enabled']]
+        analog_channels += [channel for channel in config['analog_output'].keys() if config['analog_output'][channel]['enabled']]
         # Remove curves for analog channels that are no longer active
         for ch_idx in list(self.active_channels):
-            if not ch_idx in config['analog'].keys() or not config['analog'][ch_idx]['enabled']:
+            if not ch_idx in analog_channels:
                 self.plot_widget.removeItem(self.curves[ch_idx])
                 del self.curves[ch_idx]
                 del self.y_data[ch_idx]
+                del self.y_times[ch_idx]
                 self.active_channels.remove(ch_idx)
             else:
                 self.y_data[ch_idx] = []
+                self.y_times[ch_idx] = []
 
         # Add curves for newly active analog channels
-        for channel in config['analog'].keys():
-            if config['analog'][channel]['enabled'] and channel not in self.active_channels:
+        for channel in analog_channels:
+            if channel not in self.active_channels:
                 pen_color = pg.intColor(len(self.curves))
                 self.curves[channel] = self.plot_widget.plot(pen=pen_color, name=channel)
                 self.y_data[channel] = []
+                self.y_times[channel] = []
                 self.active_channels.append(channel)
 
+        # Session history of the analog channels, kept unless the channels change
+        if(self.history.channels != self.active_channels):
+            for ch_idx in list(self.history_curves.keys()):
+                self.history_plot_widget.removeItem(self.history_curves[ch_idx])
+            self.history_curves = {}
+            for i, channel in enumerate(self.active_channels):
+                self.history_curves[channel] = self.history_plot_widget.plot(pen=pg.intColor(i), name=channel)
+            self.history = SessionHistory(self.active_channels)
+
+        # Calibrated channels are in their own units
+        units = channel_units(config)
+        PlotsTab.set_value_label(self.plot_widget, [units[channel] for channel in self.active_channels])
+        PlotsTab.set_value_label(self.history_plot_widget, [units[channel] for channel in self.active_channels])
+
         # === DIGITAL ===
         # Remove previous digital waveforms
         for ch_idx in list(self.active_digital_channels):
@@ -692,7 +1009,16 @@ class PlotsTab(QWidget):
         self.x_data = []
         #set max samples
         self.max_points = int(self.max_time * config['device']['sample_rate'])
+        rates = channel_rates(config)
+        self.channel_points = {channel: max(1, int(self.max_time * rates[channel])) for channel in self.active_channels}
     
+    def set_value_label(plot_widget, units):
+        units = sorted(set(units))
+        if(not units or units == ['V']):
+            plot_widget.setLabel('left', 'Voltage', units='V')
+        else:
+            plot_widget.setLabel('left', f"Value ({', '.join(unit or '-' for unit in units)})", units=None)
+
     def binaryPlotValue(index, truthValue):
         position = index + 0.5
         if(truthValue):
@@ -718,48 +1044,168 @@ class PlotsTab(QWidget):
         
         
 
+class ChannelSelectDialog(QDialog):
+    def __init__(self, channels, selected=None, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Select Recorded Channels")
+        layout = QVBoxLayout(self)
+
+        # Channel list, everything is checked when no selection was made
+        self.checkboxes = {}
+        for channel in channels:
+            checkbox = QCheckBox(channel)
+            checkbox.setChecked(selected is None or channel in selected)
+            self.checkboxes[channel] = checkbox
+            layout.addWidget(checkbox)
+
+        # OK/Cancel buttons
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def selected_channels(self):
+        #None records every enabled channel, including ones enabled later
+        selected = [channel for channel, checkbox in self.checkboxes.items() if checkbox.isChecked()]
+        if(len(selected) == len(self.checkboxes)):
+            return None
+        return selected
+
 # === Recording Tab with Controls ===
 class RecordingTab(QWidget):
-    start_recording_signal = pyqtSignal(str)
-    stop_recording_signal = pyqtSignal()
+    start_recording_signal = pyqtSignal(int, dict) # recorder id, {'filename', 'format', 'channels', 'interval'}
+    stop_recording_signal = pyqtSignal(int) # recorder id
+    remove_recorder_signal = pyqtSignal(int) # recorder id
 
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout()
-        self.status_label = QLabel("Not Recording")
-        self.start_button = QPushButton("Start Recording")
-        self.stop_button = QPushButton("Stop Recording")
-        self.stop_button.setEnabled(False)
-        self.filename = None
-        self.recording = False
+        self.recorders_layout = QVBoxLayout()
+        self.recorders = {} # recorder id -> widgets and settings
+        self.next_recorder_id = 0
+        self.available_channels = []
 
-        self.start_button.clicked.connect(self.start_recording)
-        self.stop_button.clicked.connect(self.stop_recording)
+        add_button = QPushButton("Add Recorder")
+        add_button.clicked.connect(self.add_recorder)
 
-        layout.addWidget(self.start_button)
-        layout.addWidget(self.stop_button)
-        layout.addWidget(self.status_label)
+        layout.addLayout(self.recorders_layout)
+        layout.addWidget(add_button)
         self.setLayout(layout)
+        self.add_recorder()
+
+    def add_recorder(self):
+        recorder_id = self.next_recorder_id
+        self.next_recorder_id = self.next_recorder_id + 1
+        group = QGroupBox(f"Recorder {recorder_id + 1}")
+        group_layout = QVBoxLayout()
+        recorder = {
+            'group': group,
+            #journals survive crashes and are turned into .csv files with Journal.py
+            'format_cb': QComboBox(),
+            #empty records every sample, otherwise one averaged row per interval
+            'interval_input': QLineEdit(),
+            'channels_button': QPushButton("Channels: All"),
+            'start_button': QPushButton("Start Recording"),
+            'stop_button': QPushButton("Stop Recording"),
+            'remove_button': QPushButton("Remove"),
+            'status_label': QLabel("Not Recording"),
+            'channels': None,
+            'filename': None,
+            'recording': False
+        }
+        recorder['format_cb'].addItems(list(RECORDING_FORMATS.keys()))
+        recorder['interval_input'].setPlaceholderText("Every sample")
+        recorder['stop_button'].setEnabled(False)
+        recorder['channels_button'].clicked.connect(lambda checked=False, r=recorder_id: self.select_channels(r))
+        recorder['start_button'].clicked.connect(lambda checked=False, r=recorder_id: self.start_recording(r))
+        recorder['stop_button'].clicked.connect(lambda checked=False, r=recorder_id: self.stop_recording([r]))
+        recorder['remove_button'].clicked.connect(lambda checked=False, r=recorder_id: self.remove_recorder(r))
+
+        settings_layout = QHBoxLayout()
+        settings_layout.addWidget(QLabel("Format:"))
+        settings_layout.addWidget(recorder['format_cb'])
+        settings_layout.addWidget(QLabel("Interval:"))
+        settings_layout.addWidget(recorder['interval_input'])
+        settings_layout.addWidget(QLabel("s"))
+        group_layout.addLayout(settings_layout)
+        group_layout.addWidget(recorder['channels_button'])
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(recorder['start_button'])
+        button_layout.addWidget(recorder['stop_button'])
+        button_layout.addWidget(recorder['remove_button'])
+        group_layout.addLayout(button_layout)
+        group_layout.addWidget(recorder['status_label'])
+        group.setLayout(group_layout)
+
+        self.recorders[recorder_id] = recorder
+        self.recorders_layout.addWidget(group)
+
+    def remove_recorder(self, recorder_id):
+        self.stop_recording([recorder_id])
+        recorder = self.recorders.pop(recorder_id)
+        recorder['group'].deleteLater()
+        self.remove_recorder_signal.emit(recorder_id)
+
+    def select_channels(self, recorder_id):
+        recorder = self.recorders[recorder_id]
+        dialog = ChannelSelectDialog(self.available_channels, recorder['channels'], self)
+        if dialog.exec_() == QDialog.Accepted:
+            recorder['channels'] = dialog.selected_channels()
+            if(recorder['channels'] is None):
+                recorder['channels_button'].setText("Channels: All")
+            else:
+                recorder['channels_button'].setText(f"Channels: {len(recorder['channels'])} selected")
 
-    def start_recording(self):
+    def start_recording(self, recorder_id):
+        recorder = self.recorders[recorder_id]
+        input_val = recorder['interval_input'].text()
+        try:
+            interval = None
+            if input_val:
+                interval = float(input_val)
+                if(interval <= 0):
+                    raise Exception("Interval cannot be negative")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Invalid recording interval: {e}")
+            return
         options = QFileDialog.Options()
-        filename, _ = QFileDialog.getSaveFileName(self, "Save Recording As", "", "CSV Files (*.csv)", options=options)
+        recording_format = recorder['format_cb'].currentText()
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Recording As", "", RECORDING_FORMATS[recording_format], options=options)
         if filename:
-            self.status_label.setText(f"Recording...")
-            self.start_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.filename = filename
-            self.recording = True
-            self.start_recording_signal.emit(filename)
+            recorder['status_label'].setText(f"Recording...")
+            recorder['start_button'].setEnabled(False)
+            recorder['stop_button'].setEnabled(True)
+            recorder['format_cb'].setEnabled(False)
+            recorder['interval_input'].setEnabled(False)
+            recorder['channels_button'].setEnabled(False)
+            recorder['filename'] = filename
+            recorder['recording'] = True
+            self.start_recording_signal.emit(recorder_id, {'filename': filename, 'format': recording_format, 'channels': recorder['channels'], 'interval': interval})
+
+    def stop_recording(self, recorder_ids=None):
+        #all recorders are stopped when the DAQ stops
+        if(recorder_ids is None):
+            recorder_ids = list(self.recorders.keys())
+        saved = [self.recorders[recorder_id]['filename'] for recorder_id in recorder_ids if self.recorders[recorder_id]['recording']]
+        if(saved):
+            QMessageBox.information(self,"Info", "Recording stoped and saved to: " + ", ".join(saved))
+        for recorder_id in recorder_ids:
+            self.reset_recorder(recorder_id)
+            self.stop_recording_signal.emit(recorder_id)
+
+    def reset_recorder(self, recorder_id):
+        recorder = self.recorders[recorder_id]
+        recorder['recording'] = False
+        recorder['status_label'].setText("Not Recording")
+        recorder['start_button'].setEnabled(True)
+        recorder['stop_button'].setEnabled(False)
+        recorder['format_cb'].setEnabled(True)
+        recorder['interval_input'].setEnabled(True)
+        recorder['channels_button'].setEnabled(True)
 
-    def stop_recording(self):
-        if(self.recording):
-            QMessageBox.information(self,"Info", f"Recording stoped and saved to: {self.filename}")
-        self.recording = False
-        self.status_label.setText("Not Recording")
-        self.start_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
-        self.stop_recording_signal.emit()
+    def update_config(self, config):
+        self.available_channels = recorded_channels(config)
 
 # === Start/Stop Tab ===
 class ControlTab(QWidget):
@@ -797,13 +1243,24 @@ class ControlTab(QWidget):
 # === Start/Stop Tab ===
 class OutputTab(QWidget):
     update_output_signal = pyqtSignal(str, int)
+    update_analog_output_signal = pyqtSignal(str, float)
 
     def __init__(self):
         super().__init__()
+        outer_layout = QVBoxLayout()
         self.layout = QGridLayout()
         self.status_label = QLabel("DAQ Stoped")
+        self.rule_label = QLabel("No output rules triggered")
+        self.max_rule_latency = 0.0
         self.buttons = {}
-        self.setLayout(self.layout)
+        self.analog_layout = QGridLayout()
+        self.analog_widgets = {}
+        self.analog_ranges = {}
+        outer_layout.addLayout(self.layout)
+        outer_layout.addLayout(self.analog_layout)
+        outer_layout.addWidget(self.rule_label)
+        outer_layout.addStretch()
+        self.setLayout(outer_layout)
 
     def button_callback(self, button):
         if(self.buttons[button].isChecked()):
@@ -811,6 +1268,19 @@ class OutputTab(QWidget):
         else:
             self.update_output_signal.emit(button, 0)
 
+    def analog_output_callback(self, channel):
+        input_val = self.analog_widgets[channel]['value_box'].text()
+        try:
+            if not input_val:
+                raise Exception("No value")
+            value = float(input_val)
+            low, high = self.analog_ranges[channel]
+            if(value < low or value > high):
+                raise Exception(f"Value must be between {low}V and {high}V")
+            self.update_analog_output_signal.emit(channel, value)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Invalid output value: {e}")
+
     def update_layout(self, config):
         clear_layout(self.layout)
         self.buttons = {}
@@ -823,14 +1293,41 @@ class OutputTab(QWidget):
             self.layout.addWidget(self.buttons[channel], i // 2, i % 2)
             i = i+1
 
+        clear_layout(self.analog_layout)
+        self.analog_widgets = {}
+        self.analog_ranges = {}
+        i = 0
+        for channel in config['analog_output'].keys():
+            channel_widgets = {'value_box': QLineEdit(), 'set_button': QPushButton(f"Set {channel}")}
+            channel_widgets['set_button'].clicked.connect(lambda _, c = channel: self.analog_output_callback(c))
+            self.analog_layout.addWidget(channel_widgets['set_button'], i, 0)
+            self.analog_layout.addWidget(channel_widgets['value_box'], i, 1)
+            self.analog_layout.addWidget(QLabel("V"), i, 2)
+            self.analog_widgets[channel] = channel_widgets
+            i = i+1
+
+
+    def rule_triggered(self, channel, value, latency):
+        if(channel in self.buttons):
+            self.buttons[channel].setChecked(value == 1)
+        self.max_rule_latency = max(self.max_rule_latency, latency)
+        self.rule_label.setText(f"Rule set {channel} to {value}: latency {latency * 1000:.1f}ms (max {self.max_rule_latency * 1000:.1f}ms)")
 
     def update_config(self, config):
+        self.max_rule_latency = 0.0
         for channel in config['digital'].keys():
             self.buttons[channel].setChecked(False)
             if(config['digital'][channel]['enabled'] and config['digital'][channel]['mode'] == 'Output'):
                 self.buttons[channel].setEnabled(True)
             else:
                 self.buttons[channel].setEnabled(False)
+        for channel in config['analog_output'].keys():
+            settings = config['analog_output'][channel]
+            enabled = settings['enabled'] and settings['mode'] == 'Static'
+            self.analog_ranges[channel] = settings['range']
+            self.analog_widgets[channel]['value_box'].setText(str(settings['value']))
+            self.analog_widgets[channel]['value_box'].setEnabled(enabled)
+            self.analog_widgets[channel]['set_button'].setEnabled(enabled)
 
 # === Main Application ===
 class MainWindow(QWidget):
@@ -841,13 +1338,16 @@ class MainWindow(QWidget):
 
         #shared data
         self.plot_queue = queue.Queue(maxsize=1000)
-        self.record_queue = queue.Queue(maxsize=1000)
-        self.recording_flag = threading.Event()
+        self.history_queue = queue.Queue()
+        self.recording_workers = {} # recorder id -> RecordingWorker
         self.config_data = null_config()
 
         # DAQ Thread
-        self.daq_worker = DAQWorker(self.plot_queue, self.record_queue, self.recording_flag)
+        self.daq_worker = DAQWorker(self.plot_queue, [], self.history_queue)
         self.daq_worker.configuration_exception.connect(self.handle_config_exception)
+        self.daq_worker.acquisition_exception.connect(self.handle_acquisition_exception)
+        self.daq_worker.rules_exception.connect(self.handle_rules_exception)
+        self.daq_worker.rule_triggered.connect(self.rule_triggered)
 
         # Layout
         layout = QHBoxLayout()
@@ -875,6 +1375,7 @@ class MainWindow(QWidget):
         output_layout = QVBoxLayout()
         self.output_tab = OutputTab()
         self.output_tab.update_output_signal.connect(self.input_update)
+        self.output_tab.update_analog_output_signal.connect(self.analog_output_update)
         output_layout.addWidget(self.output_tab)
         self.output_group.setLayout(output_layout)
 
@@ -891,20 +1392,17 @@ class MainWindow(QWidget):
         tabs = QTabWidget()
         self.config_tab = ConfigTab(self.config_data)
         tabs.addTab(self.config_tab, "Configuration")
-        self.plots_tab = PlotsTab(self.plot_queue)
+        self.plots_tab = PlotsTab(self.plot_queue, self.history_queue)
         tabs.addTab(self.plots_tab, "Plots")
         layout.addWidget(tabs)
 
         #Establish GUI
         self.setLayout(layout)
 
-        # Recording Thread
-        self.recording_worker = RecordingWorker(self.record_queue, self.recording_flag)
-        
-        # Connect Recording Signals
-        self.recording_worker.file_exception.connect(self.file_exception)
+        # Connect Recording Signals, a recording thread is made for each recorder when it first starts
         self.recording_tab.start_recording_signal.connect(self.start_recording)
         self.recording_tab.stop_recording_signal.connect(self.stop_recording)
+        self.recording_tab.remove_recorder_signal.connect(self.remove_recorder)
 
         # Connect Configuration Signals
         self.config_tab.config_changed.connect(self.handle_config_update)
@@ -912,13 +1410,32 @@ class MainWindow(QWidget):
 
         
 
-    @pyqtSlot(str)
-    def start_recording(self, filename):
-        self.recording_worker.start_recording(filename)
-
-    @pyqtSlot()
-    def stop_recording(self):
-        self.recording_worker.stop_recording()
+    @pyqtSlot(int, dict)
+    def start_recording(self, recorder_id, settings):
+        if(recorder_id not in self.recording_workers):
+            recording_worker = RecordingWorker()
+            recording_worker.file_exception.connect(self.file_exception)
+            self.recording_workers[recorder_id] = recording_worker
+            #the DAQ thread reads the list, so it is replaced rather than changed
+            self.daq_worker.recorders = list(self.recording_workers.values())
+        recording_worker = self.recording_workers[recorder_id]
+        recording_worker.channels = settings['channels']
+        recording_worker.interval = settings['interval']
+        recording_worker.update_config(self.config_data)
+        if(not recording_worker.start_recording(settings['filename'], self.config_data, settings['format'])):
+            self.recording_tab.reset_recorder(recorder_id)
+
+    @pyqtSlot(int)
+    def stop_recording(self, recorder_id):
+        if(recorder_id in self.recording_workers):
+            self.recording_workers[recorder_id].stop_recording()
+
+    @pyqtSlot(int)
+    def remove_recorder(self, recorder_id):
+        recording_worker = self.recording_workers.pop(recorder_id, None)
+        self.daq_worker.recorders = list(self.recording_workers.values())
+        if(recording_worker):
+            recording_worker.stop_recording()
 
     @pyqtSlot(str)
     def file_exception(self, message):
@@ -928,23 +1445,46 @@ class MainWindow(QWidget):
     def input_update(self, button, value):
         self.daq_worker.user_input(button, value)
 
+    @pyqtSlot(str, float)
+    def analog_output_update(self, channel, value):
+        self.daq_worker.analog_output_input(channel, value)
+
+    @pyqtSlot(str, int, float)
+    def rule_triggered(self, channel, value, latency):
+        self.output_tab.rule_triggered(channel, value, latency)
+
     def stop_daq(self):
         self.daq_worker.stop()
         self.recording_tab.stop_recording()
 
     def start_daq(self):
         self.plots_tab.update_config(self.config_data)
+        #timestamps restart with the DAQ, so a new session history is started
+        self.plots_tab.reset_history()
         self.daq_worker.start()
 
     @pyqtSlot(dict)
     def handle_config_update(self, config):
-        self.control_tab.stop_daq()
+        previous_config = self.config_data
         self.config_data = config
-        self.recording_worker.update_config(config)
-        self.recording_tab.stop_recording()
-        self.daq_worker.update_config(config)
-        self.plots_tab.update_config(config)
-        self.output_tab.update_config(config)
+        #changes that do not touch the DAQ tasks are applied without stopping
+        daq_changed = self.daq_worker.requires_restart(config)
+        if(daq_changed):
+            self.control_tab.stop_daq()
+        changed_recorders = [recorder_id for recorder_id, recording_worker in self.recording_workers.items() if recording_worker.channels_changed(config)]
+        for recorder_id in changed_recorders:
+            self.recording_workers[recorder_id].update_config(config)
+        if(changed_recorders):
+            self.recording_tab.stop_recording(changed_recorders)
+        self.recording_tab.update_config(config)
+        if(daq_changed):
+            self.daq_worker.update_config(config)
+        self.daq_worker.set_rules(config.get('rules', []))
+        #rebuilding the plots clears them, so it is only done when what they show changes
+        if(plot_config(previous_config) != plot_config(config)):
+            self.plots_tab.update_config(config)
+        if(output_controls_config(previous_config) != output_controls_config(config)):
+            self.output_tab.update_config(config)
 
     @pyqtSlot(dict)
     def handle_config_structure_update(self, config):
@@ -956,8 +1496,32 @@ class MainWindow(QWidget):
         self.config_tab.reset_config()
         QMessageBox.critical(self,"Error", message)
 
+    @pyqtSlot(str)
+    def handle_acquisition_exception(self, message):
+        #through the control tab, so the DAQ can be started again after the message
+        self.control_tab.stop_daq()
+        QMessageBox.critical(self,"Error", message)
+
+    @pyqtSlot(str)
+    def handle_rules_exception(self, message):
+        #the DAQ keeps running without rules
+        QMessageBox.critical(self,"Error", message)
+
 # === Run App ===
-app = QApplication(sys.argv)
-window = MainWindow()
-window.show()
-sys.exit(app.exec_())
\ No newline at end of file
+def report_startup_time(window):
+    startup_time = time.perf_counter() - import_start_time
+    if(startup_time > STARTUP_TIME_BUDGET):
+        #the packaged exe has no console, so a slow start is also shown in the title
+        print(f"Startup took {startup_time:.2f}s (budget {STARTUP_TIME_BUDGET:.2f}s)", file=sys.stderr)
+        window.setWindowTitle(f"{window.windowTitle()} (slow startup: {startup_time:.1f}s)")
+
+def main():
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    #runs once the event loop has drawn the window
+    QTimer.singleShot(0, lambda: report_startup_time(window))
+    return app.exec_()
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,145 @@
+import os
+import sys
+import glob
+import json
+import zlib
+import time
+import struct
+import argparse
+import numpy as np
+
+# Crash-safe recordings. A journal is a header frame followed by frames of
+# rows, each stored as float64 values and guarded by its length and a crc32.
+# Frames are committed in groups with one fsync, so a crash loses at most the
+# rows since the last commit, and recover() turns everything up to the last
+# intact frame into a normal .csv recording.
+
+JOURNAL_MAGIC = b'NIDAQ-JOURNAL-1\n'
+JOURNAL_SUFFIX = '.journal'
+FRAME_HEADER = struct.Struct('<II') # payload length, crc32 of the payload
+
+# === writing ===
+
+class JournalWriter:
+    """Appends rows to a journal. Rows are collected by writerow() and written and synced by commit()."""
+    def __init__(self, path: str, columns: list, units: list = None):
+        self.columns = list(columns)
+        self.rows = []
+        self.file = open(path, 'wb')
+        header = json.dumps({'columns': self.columns, 'units': units}).encode()
+        self.file.write(JOURNAL_MAGIC + make_frame(header))
+        self.sync()
+
+    def writerow(self, sample: dict):
+        #same interface as csv.DictWriter, missing channels are stored as NaN
+        self.rows.append([float(sample.get(column, np.nan)) for column in self.columns])
+
+    def commit(self):
+        if(not self.rows):
+            return
+        payload = np.array(self.rows, dtype='<f8').tobytes()
+        self.rows = []
+        self.file.write(make_frame(payload))
+        self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        try:
+            self.commit()
+        finally:
+            self.file.close()
+
+def make_frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+# === reading ===
+
+def read_frames(file):
+    """Yields the payload of each intact frame and stops at the first torn or corrupt one."""
+    while True:
+        header = file.read(FRAME_HEADER.size)
+        if(len(header) < FRAME_HEADER.size):
+            return
+        length, checksum = FRAME_HEADER.unpack(header)
+        payload = file.read(length)
+        if(len(payload) < length or zlib.crc32(payload) != checksum):
+            return
+        yield payload
+
+def read_journal_header(file) -> dict:
+    if(file.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC):
+        raise ValueError(f"{file.name} is not a recording journal")
+    try:
+        return json.loads(next(read_frames(file)).decode())
+    except StopIteration:
+        raise ValueError(f"{file.name} has no readable header")
+
+def read_journal(path: str):
+    """Yields the header dict, then each committed block of rows as a float array."""
+    with open(path, 'rb') as f:
+        header = read_journal_header(f)
+        yield header
+        row_bytes = 8 * len(header['columns'])
+        for payload in read_frames(f):
+            #a frame with a partial row was not written by JournalWriter
+            if(len(payload) % row_bytes):
+                return
+            yield np.frombuffer(payload, dtype='<f8').reshape(-1, len(header['columns']))
+
+def recovered_path(journal_path: str, out_dir: str = None) -> str:
+    name = os.path.splitext(os.path.basename(journal_path))[0] + '.csv'
+    return os.path.join(out_dir or os.path.dirname(journal_path), name)
+
+def recover(journal_path: str, out_path: str = None) -> tuple:
+    """Writes the committed rows of a journal to a .csv recording. Returns (output path, rows, bytes discarded)."""
+    out_path = out_path or recovered_path(journal_path)
+    rows = 0
+    with open(journal_path, 'rb') as f:
+        header = read_journal_header(f)
+        row_bytes = 8 * len(header['columns'])
+        with open(out_path, 'w', newline='', encoding='utf-8') as out:
+            if(header.get('units')):
+                out.write('#units,' + ','.join(header['units']) + '\n')
+            out.write(','.join(header['columns']) + '\n')
+            committed = f.tell()
+            for payload in read_frames(f):
+                if(len(payload) % row_bytes):
+                    break
+                block = np.frombuffer(payload, dtype='<f8').reshape(-1, len(header['columns']))
+                np.savetxt(out, block, delimiter=',', fmt='%.10g')
+                rows += len(block)
+                committed = f.tell()
+    #everything after the last intact frame was not committed before the crash
+    return out_path, rows, os.path.getsize(journal_path) - committed
+
+# === command line ===
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild .csv recordings from the journals written by the NI DAQ GUI.")
+    parser.add_argument('journals', nargs='+', help=f"{JOURNAL_SUFFIX} files, wildcards are allowed")
+    parser.add_argument('--out-dir', default=None, help="folder for the .csv files, next to each journal if not given")
+    args = parser.parse_args(argv)
+
+    journal_paths = []
+    for pattern in args.journals:
+        journal_paths += sorted(glob.glob(pattern)) or [pattern]
+    if(args.out_dir):
+        os.makedirs(args.out_dir, exist_ok=True)
+    failures = 0
+    for path in journal_paths:
+        start_time = time.perf_counter()
+        try:
+            out_path, rows, discarded = recover(path, recovered_path(path, args.out_dir))
+        except (OSError, ValueError) as e:
+            failures += 1
+            print(f"{path}: failed: {e}", file=sys.stderr)
+            continue
+        note = f", discarded {discarded} bytes after the last committed frame" if discarded else ""
+        print(f"{path} -> {out_path}: {rows} rows in {time.perf_counter() - start_time:.1f}s{note}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
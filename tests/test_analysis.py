@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from Analysis import Recording, build_index, load_index, index_path, config_path
+
+CHANNELS = ['ai0', 'ai1', 'port0/line0']
+
+def write_recording(path, num_rows=1000, gaps=True):
+    """A recording like the GUI writes, with a units line, digital True/False and empty cells. Returns its rows."""
+    rng = np.random.default_rng(2)
+    timestamps = np.arange(num_rows) * 0.01
+    analog = rng.normal(size=(num_rows, 2)) * [1.0, 100.0]
+    digital = rng.integers(0, 2, num_rows).astype(float)
+    rows = np.column_stack([timestamps, analog, digital])
+    if(gaps):
+        #ai1 is a slower channel that is only present every 5th row
+        rows[np.arange(num_rows) % 5 != 4, 2] = np.nan
+    with open(path, 'w', newline='') as f:
+        f.write('#units,s,V,bar,\n')
+        f.write(','.join(['timestamp'] + CHANNELS) + '\n')
+        for row in rows:
+            cells = [repr(float(row[0])), repr(float(row[1])), '' if np.isnan(row[2]) else repr(float(row[2])), str(bool(row[3]))]
+            f.write(','.join(cells) + '\n')
+    return rows
+
+def brute_force(rows, start, end):
+    keep = np.ones(len(rows), dtype=bool)
+    if(start is not None):
+        keep &= rows[:, 0] >= start
+    if(end is not None):
+        keep &= rows[:, 0] <= end
+    return rows[keep]
+
+RANGES = [(None, None), (0.0, 9.99), (1.234, 5.678), (-5.0, 0.5), (9.5, 20.0), (3.0, 3.0), (4.001, 4.009), (20.0, 30.0), (None, 2.5), (7.5, None)]
+
+@pytest.fixture(params=[7, 64, 4096])
+def recording(request, tmp_path):
+    path = str(tmp_path / 'session.csv')
+    rows = write_recording(path)
+    build_index(path, chunk_rows=request.param)
+    with Recording(path) as recording:
+        yield recording, rows
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_query_matches_brute_force(recording, start, end):
+    recording, rows = recording
+    expected = brute_force(rows, start, end)
+    result = recording.query(start, end)
+    assert list(result.keys()) == ['timestamp'] + CHANNELS
+    assert np.array_equal(result['timestamp'], expected[:, 0])
+    for i, channel in enumerate(CHANNELS):
+        assert np.array_equal(result[channel], expected[:, i + 1], equal_nan=True)
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_min_max_matches_brute_force(recording, start, end):
+    recording, rows = recording
+    expected = brute_force(rows, start, end)
+    result = recording.min_max(start, end, channels=['ai1', 'ai0'])
+    assert list(result.keys()) == ['ai1', 'ai0']
+    for channel, column in (('ai1', 2), ('ai0', 1)):
+        values = expected[:, column]
+        values = values[~np.isnan(values)]
+        if(len(values) == 0):
+            assert all(np.isnan(result[channel]))
+        else:
+            assert result[channel] == (values.min(), values.max())
+
+def test_recording_properties(recording):
+    recording, rows = recording
+    assert recording.channels == CHANNELS
+    assert recording.units == {'timestamp': 's', 'ai0': 'V', 'ai1': 'bar', 'port0/line0': ''}
+    assert recording.duration == pytest.approx(rows[-1, 0] - rows[0, 0])
+    with pytest.raises(KeyError):
+        recording.query(channels=['ai7'])
+
+def test_index_is_rebuilt_when_the_recording_changes(tmp_path):
+    path = str(tmp_path / 'session.csv')
+    write_recording(path, num_rows=100)
+    assert load_index(path)['row_counts'].sum() == 100
+    assert index_path(path) == str(tmp_path / 'session.csv.idx.npz')
+    write_recording(path, num_rows=250)
+    assert load_index(path)['row_counts'].sum() == 250
+
+def test_empty_recording(tmp_path):
+    path = str(tmp_path / 'session.csv')
+    write_recording(path, num_rows=0)
+    with Recording(path) as recording:
+        assert recording.duration == 0.0
+        assert len(recording.query()['timestamp']) == 0
+        assert all(np.isnan(recording.min_max()['ai0']))
+
+def test_config_path_of_rate_groups():
+    assert config_path('data/session.csv') == 'data/session.config.json'
+    assert config_path('data/session.10Hz.csv') == 'data/session.config.json'
+    assert config_path('data/session.0.5Hz.csv') == 'data/session.config.json'
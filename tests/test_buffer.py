@@ -0,0 +1,46 @@
+import pytest
+
+from Acquisition import input_buffer_config, MAX_INPUT_BUFFER_BYTES
+
+def make_config(sample_rate, num_channels=1, **buffer):
+    analog = {f"ai{i}": {'enabled': True} for i in range(num_channels)}
+    analog['ai9'] = {'enabled': False}
+    return {'device': {'sample_rate': sample_rate, 'buffer': buffer}, 'analog': analog}
+
+def test_read_size_follows_the_latency():
+    assert input_buffer_config(make_config(1000.0))['read_samples'] == 50
+    assert input_buffer_config(make_config(1000.0, read_latency=0.01))['read_samples'] == 10
+    #a read always waits for at least one sample
+    assert input_buffer_config(make_config(10.0))['read_samples'] == 1
+
+def test_buffer_holds_two_seconds():
+    assert input_buffer_config(make_config(5000.0)) == {'read_samples': 250, 'buffer_samples': 10000}
+
+def test_buffer_minimums():
+    #slow rates keep the DAQmx default of 1000 samples
+    assert input_buffer_config(make_config(10.0))['buffer_samples'] == 1000
+    #and the buffer always holds 4 reads
+    assert input_buffer_config(make_config(100.0, read_samples=1000)) == {'read_samples': 1000, 'buffer_samples': 4000}
+
+def test_buffer_is_capped_over_all_channels():
+    assert input_buffer_config(make_config(1e6, num_channels=8))['buffer_samples'] == MAX_INPUT_BUFFER_BYTES // (8 * 8)
+    assert input_buffer_config(make_config(1e6, num_channels=1))['buffer_samples'] == 2000000
+    #the cap never goes below 4 reads
+    assert input_buffer_config(make_config(1e6, num_channels=8, read_samples=500000))['buffer_samples'] == 2000000
+
+def test_explicit_overrides():
+    assert input_buffer_config(make_config(1000.0, read_samples=20, buffer_samples=20)) == {'read_samples': 20, 'buffer_samples': 20}
+
+@pytest.mark.parametrize("buffer", [
+    {'read_latency': 0},
+    {'read_latency': -0.1},
+    {'read_samples': 0},
+    {'read_samples': 2.5},
+    {'buffer_samples': -1},
+    {'buffer_samples': '1000'},
+    {'read_samples': 100, 'buffer_samples': 50},
+    {'buffer_size': 1000},
+])
+def test_invalid_overrides_are_rejected(buffer):
+    with pytest.raises(ValueError):
+        input_buffer_config(make_config(1000.0, **buffer))
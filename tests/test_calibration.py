@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from Acquisition import Calibration, thermocouple_voltage, calibration_units, calibration_errors
+
+# (thermocouple, °C, mV) from the NIST ITS-90 thermocouple tables
+NIST_POINTS = [
+    ('K', 0.0, 0.000), ('K', 100.0, 4.096), ('K', 500.0, 20.644), ('K', -100.0, -3.554),
+    ('J', 0.0, 0.000), ('J', 100.0, 5.269), ('J', 500.0, 27.393),
+    ('T', 0.0, 0.000), ('T', 100.0, 4.279), ('T', -100.0, -3.379),
+]
+
+@pytest.mark.parametrize("thermocouple, temperature, millivolts", NIST_POINTS)
+def test_thermocouple_voltage_matches_nist(thermocouple, temperature, millivolts):
+    assert thermocouple_voltage(thermocouple, [temperature])[0] == pytest.approx(millivolts, abs=0.001)
+
+@pytest.mark.parametrize("thermocouple, temperature, millivolts", NIST_POINTS)
+def test_thermocouple_calibration_inverts_nist(thermocouple, temperature, millivolts):
+    calibration = Calibration({'type': 'thermocouple', 'thermocouple': thermocouple, 'cjc': 0.0})
+    assert calibration.apply([millivolts / 1000.0])[0] == pytest.approx(temperature, abs=0.05)
+
+@pytest.mark.parametrize("thermocouple", ['J', 'K', 'T'])
+def test_thermocouple_table_is_sorted_and_finite(thermocouple):
+    calibration = Calibration({'type': 'thermocouple', 'thermocouple': thermocouple})
+    assert np.all(np.isfinite(calibration.table_volts))
+    assert np.all(np.diff(calibration.table_volts) > 0)
+
+def test_thermocouple_cold_junction_and_range():
+    calibration = Calibration({'type': 'thermocouple', 'thermocouple': 'K', 'cjc': 25.0})
+    cjc_volts = thermocouple_voltage('K', [25.0])[0] / 1000.0
+    result = calibration.apply([0.0, 4.096e-3 - cjc_volts, 1.0])
+    assert result[0] == pytest.approx(25.0, abs=0.05)
+    assert result[1] == pytest.approx(100.0, abs=0.05)
+    assert np.isnan(result[2])
+    assert calibration.units == '°C'
+
+def test_linear_and_polynomial():
+    linear = Calibration({'type': 'linear', 'gain': 2.0, 'offset': 0.5, 'units': 'bar'})
+    assert linear.apply([0.0, 1.0, -1.0]).tolist() == [0.5, 2.5, -1.5]
+    polynomial = Calibration({'type': 'polynomial', 'coefficients': [1.0, 0.0, 3.0], 'units': 'N'})
+    assert polynomial.apply([0.0, 2.0]).tolist() == [1.0, 13.0]
+
+def test_table_interpolates_and_holds_ends():
+    table = Calibration({'type': 'table', 'volts': [5, 0, 1], 'values': [30, 0, 10], 'units': 'mm'})
+    assert table.apply([-1.0, 0.5, 3.0, 6.0]).tolist() == [0.0, 5.0, 20.0, 30.0]
+
+def test_units():
+    assert calibration_units(None) == 'V'
+    assert calibration_units({'type': 'thermocouple', 'thermocouple': 'T'}) == '°C'
+    assert calibration_units({'type': 'linear', 'units': 'bar'}) == 'bar'
+
+@pytest.mark.parametrize("settings", [
+    {'type': 'spline'},
+    {'units': 'V'},
+    {'type': 'thermocouple', 'thermocouple': 'E'},
+    {'type': 'thermocouple', 'thermocouple': 'T', 'cjc': 900.0},
+    {'type': 'table', 'volts': [0, 1, 5], 'values': [0, 10]},
+    {'type': 'table', 'volts': [0], 'values': [0]},
+    {'type': 'polynomial', 'coefficients': []},
+    {'type': 'polynomial'},
+    {'type': 'linear', 'gain': None},
+])
+def test_bad_calibrations_raise_value_error(settings):
+    with pytest.raises(ValueError):
+        Calibration(settings)
+
+def test_calibration_errors_name_the_channel():
+    config = {'analog': {
+        'ai0': {'calibration': None},
+        'ai1': {'calibration': {'type': 'linear', 'gain': 2.0}},
+        'ai2': {'calibration': {'type': 'thermocouple', 'thermocouple': 'E'}},
+        'ai3': {'calibration': 'K'},
+    }}
+    errors = calibration_errors(config)
+    assert sorted(errors) == ['ai2', 'ai3']
+    assert "Unknown thermocouple type: E" in errors['ai2']
@@ -0,0 +1,101 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from Export import export_recording, export_recordings, read_chunks, main
+
+COLUMNS = ['timestamp', 'ai0', 'ai1', 'port0/line0']
+UNITS = {'timestamp': 's', 'ai0': 'V', 'ai1': 'bar', 'port0/line0': ''}
+CONFIG = {'device': {'sample_rate': 100.0}, 'analog': {'ai0': {'enabled': True}, 'ai1': {'enabled': True, 'rate': 20.0}}, 'digital': {'port0/line0': {'enabled': True}}, 'analog_output': {}}
+
+def write_recording(path, num_rows=250, config=CONFIG):
+    """A recording like the GUI writes, ai1 is a slower channel with empty cells. Returns its rows."""
+    rng = np.random.default_rng(7)
+    rows = np.column_stack([np.arange(num_rows) * 0.01, rng.normal(size=num_rows), rng.normal(size=num_rows), rng.integers(0, 2, num_rows)])
+    rows[np.arange(num_rows) % 5 != 4, 2] = np.nan
+    with open(path, 'w', newline='') as f:
+        f.write('#units,' + ','.join(UNITS[column] for column in COLUMNS) + '\n')
+        f.write(','.join(COLUMNS) + '\n')
+        for row in rows:
+            f.write(','.join([repr(float(row[0])), repr(float(row[1])), '' if np.isnan(row[2]) else repr(float(row[2])), str(bool(row[3]))]) + '\n')
+    if(config):
+        with open(os.path.splitext(path)[0] + '.config.json', 'w') as f:
+            json.dump(config, f)
+    return rows
+
+def check_metadata(metadata, config=CONFIG):
+    assert metadata == {'source': 'session.csv', 'config': config, 'units': UNITS}
+
+def test_read_chunks(tmp_path):
+    path = str(tmp_path / 'session.csv')
+    rows = write_recording(path)
+    chunks = read_chunks(path, chunk_rows=100)
+    assert next(chunks) == COLUMNS
+    chunks = list(chunks)
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert np.array_equal(np.concatenate(chunks), rows, equal_nan=True)
+
+def test_npz_round_trip(tmp_path):
+    path = str(tmp_path / 'session.csv')
+    rows = write_recording(path)
+    os.makedirs(tmp_path / 'out')
+    out_path, num_rows, _ = export_recording(path, str(tmp_path / 'out'), 'npz', chunk_rows=64)
+    assert out_path == str(tmp_path / 'out' / 'session.npz')
+    assert num_rows == len(rows)
+    with np.load(out_path) as saved:
+        assert saved['columns'].tolist() == COLUMNS
+        check_metadata(json.loads(str(saved['metadata'])))
+        assert np.array_equal(saved['column_0'], rows[:, 0])
+        assert np.array_equal(saved['column_2'], rows[:, 2], equal_nan=True)
+        assert saved['column_3'].dtype == bool
+        assert np.array_equal(saved['column_3'], rows[:, 3] == 1)
+
+@pytest.mark.parametrize("export_format", ['parquet', 'arrow'])
+def test_arrow_round_trip(tmp_path, export_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    import pyarrow.ipc
+    path = str(tmp_path / 'session.csv')
+    rows = write_recording(path)
+    out_path, num_rows, _ = export_recording(path, None, export_format, chunk_rows=64)
+    assert out_path == str(tmp_path / f"session.{export_format}")
+    assert num_rows == len(rows)
+    if(export_format == 'parquet'):
+        table = pa.parquet.read_table(out_path)
+    else:
+        table = pa.ipc.open_file(out_path).read_all()
+    assert table.column_names == COLUMNS
+    assert [str(field.type) for field in table.schema] == ['double', 'double', 'double', 'bool']
+    check_metadata(json.loads(table.schema.metadata[b'recording']))
+    assert np.array_equal(table.column('ai0').to_numpy(), rows[:, 1])
+    #the empty cells of the slower channel are nulls
+    ai1 = table.column('ai1')
+    assert ai1.null_count == np.count_nonzero(np.isnan(rows[:, 2]))
+    assert np.array_equal(ai1.to_numpy(zero_copy_only=False), rows[:, 2], equal_nan=True)
+    assert table.column('port0/line0').to_pylist() == (rows[:, 3] == 1).tolist()
+
+def test_digital_columns_without_a_config(tmp_path):
+    path = str(tmp_path / 'session.csv')
+    rows = write_recording(path, config=None)
+    out_path, _, _ = export_recording(path, None, 'npz')
+    with np.load(out_path) as saved:
+        check_metadata(json.loads(str(saved['metadata'])), config=None)
+        assert saved['column_3'].dtype == bool
+
+def test_parallel_export(tmp_path):
+    paths = []
+    for name in ('a', 'b', 'c'):
+        paths.append(str(tmp_path / f'{name}.csv'))
+        write_recording(paths[-1], num_rows=100 + len(paths))
+    paths.append(str(tmp_path / 'missing.csv'))
+    out_dir = str(tmp_path / 'out')
+    results = dict(export_recordings(paths, out_dir, 'npz', jobs=2))
+    assert sorted(results) == sorted(paths)
+    assert isinstance(results[paths[-1]], OSError)
+    for i, path in enumerate(paths[:-1]):
+        out_path, num_rows, _ = results[path]
+        assert out_path == os.path.join(out_dir, os.path.basename(path)[0] + '.npz')
+        assert num_rows == 101 + i
+    assert main([str(tmp_path / '*.csv'), '--format', 'npz', '--out-dir', out_dir, '--jobs', '2']) == 0
@@ -0,0 +1,116 @@
+import queue
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+import GUI
+from GUI import HistoryLevel, SessionHistory, DAQWorker, reduce_block
+
+def make_samples(duration=50.0, rate=20.0, seed=4):
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(int(duration * rate)) / rate
+    values = rng.normal(size=(len(timestamps), 2))
+    #the second channel is slower and NaN between its samples
+    values[np.arange(len(timestamps)) % 3 != 0, 1] = np.nan
+    return timestamps, values
+
+def add_in_blocks(target, timestamps, values, seed=5):
+    rng = np.random.default_rng(seed)
+    start = 0
+    while start < len(timestamps):
+        end = start + int(rng.integers(1, 40))
+        target.add(timestamps[start:end], values[start:end])
+        start = end
+
+def brute_force(timestamps, values, width):
+    buckets = np.floor(timestamps / width).astype(np.int64)
+    times, minimums, maximums = [], [], []
+    for bucket in np.unique(buckets):
+        in_bucket = values[buckets == bucket]
+        times.append(bucket * width)
+        with np.errstate(all='ignore'):
+            minimums.append([np.nanmin(column) if np.any(~np.isnan(column)) else np.nan for column in in_bucket.T])
+            maximums.append([np.nanmax(column) if np.any(~np.isnan(column)) else np.nan for column in in_bucket.T])
+    return np.array(times), np.array(minimums), np.array(maximums)
+
+@pytest.mark.parametrize("width", [0.5, 1.0, 7.0])
+def test_level_matches_brute_force(width):
+    timestamps, values = make_samples()
+    level = HistoryLevel(width, 2)
+    add_in_blocks(level, timestamps, values)
+    times, minimums, maximums = level.buckets()
+    expected = brute_force(timestamps, values, width)
+    assert np.array_equal(times, expected[0])
+    assert np.array_equal(minimums, expected[1], equal_nan=True)
+    assert np.array_equal(maximums, expected[2], equal_nan=True)
+
+def test_level_ring_keeps_newest_buckets(monkeypatch):
+    monkeypatch.setattr(GUI, 'HISTORY_BUCKETS', 10)
+    timestamps, values = make_samples()
+    level = HistoryLevel(1.0, 2)
+    add_in_blocks(level, timestamps, values)
+    times, minimums, maximums = level.buckets()
+    expected = brute_force(timestamps, values, 1.0)
+    #10 closed buckets and the open one
+    assert np.array_equal(times, expected[0][-11:])
+    assert np.array_equal(minimums, expected[1][-11:], equal_nan=True)
+    assert np.array_equal(maximums, expected[2][-11:], equal_nan=True)
+
+def test_view_uses_finest_level_that_fits(monkeypatch):
+    monkeypatch.setattr(GUI, 'HISTORY_LEVELS', [1.0, 10.0])
+    timestamps, values = make_samples(duration=100.0)
+    history = SessionHistory(['ai0', 'ai1'])
+    add_in_blocks(history, timestamps, values)
+    #100 one second buckets fit, so the finest level is used
+    times, minimums, maximums = history.view(max_points=200)
+    assert np.array_equal(times, np.arange(100.0))
+    assert np.array_equal(minimums, brute_force(timestamps, values, 1.0)[1], equal_nan=True)
+    #too many for 50 points, so the 10s level is used
+    times, minimums, maximums = history.view(max_points=50)
+    assert np.array_equal(times, np.arange(0.0, 100.0, 10.0))
+    assert np.array_equal(maximums, brute_force(timestamps, values, 10.0)[2], equal_nan=True)
+    #a zoomed range fits at the finest level again, with the buckets that overlap it
+    times, minimums, maximums = history.view(20.5, 30.0, max_points=50)
+    assert np.array_equal(times, np.arange(20.0, 31.0))
+
+def test_view_of_an_empty_history():
+    history = SessionHistory(['ai0'])
+    history.add([], np.empty((0, 1)))
+    times, minimums, maximums = history.view()
+    assert len(times) == 0 and minimums.shape == (0, 1)
+
+def make_block(timestamps, values):
+    """A block as DAQTasks.read_block returns it, with None where the slower channel has no sample."""
+    return {'timestamp': timestamps.tolist(), 'ai0': values[:, 0].tolist(), 'ai1': [None if np.isnan(v) else v for v in values[:, 1]]}
+
+def test_reduced_blocks_give_the_same_history():
+    timestamps, values = make_samples(duration=200.0)
+    every_sample = SessionHistory(['ai0', 'ai1'])
+    add_in_blocks(every_sample, timestamps, values)
+    reduced = SessionHistory(['ai1', 'ai0', 'ai2'])
+    for start in range(0, len(timestamps), 37):
+        reduced.add_reduced(reduce_block(make_block(timestamps[start:start + 37], values[start:start + 37])))
+    for level, reduced_level in zip(every_sample.levels, reduced.levels):
+        times, minimums, maximums = level.buckets()
+        reduced_times, reduced_minimums, reduced_maximums = reduced_level.buckets()
+        assert np.array_equal(times, reduced_times)
+        assert np.array_equal(minimums, reduced_minimums[:, [1, 0]], equal_nan=True)
+        assert np.array_equal(maximums, reduced_maximums[:, [1, 0]], equal_nan=True)
+        #a channel that is not in the blocks stays empty
+        assert np.all(np.isnan(reduced_minimums[:, 2]))
+
+def test_history_gets_blocks_the_plots_skip():
+    timestamps, values = make_samples(duration=10.0)
+    values[150, 0] = 100.0
+    plot_queue = queue.Queue(maxsize=10)
+    history_queue = queue.Queue()
+    worker = DAQWorker(plot_queue, [], history_queue)
+    worker.queue_data(make_block(timestamps, values))
+    assert plot_queue.qsize() == 10
+    history = SessionHistory(['ai0'])
+    while not history_queue.empty():
+        history.add_reduced(history_queue.get())
+    times, minimums, maximums = history.view()
+    assert maximums[:, 0].max() == 100.0
+    assert len(times) == 10
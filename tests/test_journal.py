@@ -0,0 +1,118 @@
+import os
+import csv
+
+import numpy as np
+import pytest
+
+from Journal import JournalWriter, FRAME_HEADER, JOURNAL_MAGIC, read_journal, recover, main
+
+COLUMNS = ['timestamp', 'ai0', 'port0/line0']
+
+def write_journal(path, blocks, units=None):
+    """Writes each block of rows as one committed frame and returns all rows."""
+    writer = JournalWriter(path, COLUMNS, units)
+    rows = []
+    for block in blocks:
+        for row in block:
+            writer.writerow(dict(zip(COLUMNS, row)))
+            rows.append(row)
+        writer.commit()
+    writer.close()
+    return rows
+
+def make_blocks(num_blocks=5, rows_per_block=7):
+    rng = np.random.default_rng(1)
+    return [[[block * rows_per_block + i, float(rng.normal()), float(i % 2)] for i in range(rows_per_block)] for block in range(num_blocks)]
+
+def read_csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        lines = list(csv.reader(f))
+    return lines
+
+def frame_ends(path):
+    """Byte offset after each frame, the header frame first."""
+    ends = []
+    with open(path, 'rb') as f:
+        f.seek(len(JOURNAL_MAGIC))
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if(len(header) < FRAME_HEADER.size):
+                return ends
+            length, _ = FRAME_HEADER.unpack(header)
+            f.seek(length, os.SEEK_CUR)
+            ends.append(f.tell())
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    rows = write_journal(path, make_blocks(), units=['s', 'V', ''])
+    reader = read_journal(path)
+    header = next(reader)
+    assert header == {'columns': COLUMNS, 'units': ['s', 'V', '']}
+    assert np.array_equal(np.concatenate(list(reader)), np.array(rows))
+
+    out_path, num_rows, discarded = recover(path)
+    assert out_path == str(tmp_path / 'session.csv')
+    assert (num_rows, discarded) == (len(rows), 0)
+    lines = read_csv_rows(out_path)
+    assert lines[0] == ['#units', 's', 'V', '']
+    assert lines[1] == COLUMNS
+    assert np.allclose(np.array(lines[2:], dtype=float), rows, rtol=1e-9)
+
+def test_missing_channels_are_nan(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    writer = JournalWriter(path, COLUMNS)
+    writer.writerow({'timestamp': 0.0, 'ai0': 1.5})
+    writer.close()
+    block = list(read_journal(path))[1]
+    assert block[0, :2].tolist() == [0.0, 1.5]
+    assert np.isnan(block[0, 2])
+
+@pytest.mark.parametrize("cut", [1, FRAME_HEADER.size - 1, FRAME_HEADER.size, FRAME_HEADER.size + 8])
+def test_torn_tail_keeps_committed_frames(tmp_path, cut):
+    path = str(tmp_path / 'session.journal')
+    blocks = make_blocks()
+    write_journal(path, blocks)
+    ends = frame_ends(path)
+    #the last frame was only partly written when the recording stopped
+    torn_size = ends[-2] + cut
+    with open(path, 'r+b') as f:
+        f.truncate(torn_size)
+    out_path, num_rows, discarded = recover(path)
+    kept = sum(blocks[:-1], [])
+    assert (num_rows, discarded) == (len(kept), cut)
+    assert np.allclose(np.array(read_csv_rows(out_path)[1:], dtype=float), kept, rtol=1e-9)
+
+def test_corrupt_frame_stops_recovery(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    blocks = make_blocks()
+    write_journal(path, blocks)
+    ends = frame_ends(path)
+    #flip a byte in the payload of the third block, the frames after it are dropped too
+    with open(path, 'r+b') as f:
+        f.seek(ends[2] + FRAME_HEADER.size + 3)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    out_path, num_rows, discarded = recover(path)
+    assert num_rows == 2 * len(blocks[0])
+    assert discarded == os.path.getsize(path) - ends[2]
+    assert len(list(read_journal(path))) == 1 + 2
+
+def test_header_errors(tmp_path):
+    path = str(tmp_path / 'bad.journal')
+    with open(path, 'wb') as f:
+        f.write(b'not a journal')
+    with pytest.raises(ValueError):
+        recover(path)
+    with open(path, 'wb') as f:
+        f.write(JOURNAL_MAGIC + b'\x01')
+    with pytest.raises(ValueError):
+        recover(path)
+
+def test_command_line(tmp_path, capsys):
+    for name in ('a', 'b'):
+        write_journal(str(tmp_path / f'{name}.journal'), make_blocks(2, 3))
+    out_dir = tmp_path / 'converted'
+    assert main([str(tmp_path / '*.journal'), '--out-dir', str(out_dir)]) == 0
+    assert sorted(os.listdir(out_dir)) == ['a.csv', 'b.csv']
+    assert main([str(tmp_path / 'missing.journal')]) == 1
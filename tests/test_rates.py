@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from Acquisition import Decimator, channel_decimation, rate_groups, channel_rates, group_path
+
+def decimate_in_blocks(factor, samples, block_sizes):
+    decimator = Decimator(factor)
+    result = []
+    start = 0
+    for size in block_sizes:
+        result += decimator.process(samples[start:start + size])
+        start += size
+    return result
+
+@pytest.mark.parametrize("factor", [1, 2, 3, 10])
+@pytest.mark.parametrize("block_sizes", [[100], [1] * 100, [7, 3, 50, 1, 39], [0, 33, 0, 67]])
+def test_decimator_matches_whole_signal_average(factor, block_sizes):
+    samples = np.random.default_rng(3).normal(size=100).tolist()
+    result = decimate_in_blocks(factor, samples, block_sizes)
+    assert len(result) == len(samples)
+    #each average sits at the last sample of its run, whatever the block boundaries
+    count = len(samples) // factor
+    expected = np.asarray(samples[:count * factor]).reshape(count, factor).mean(axis=1)
+    positions = [i for i, value in enumerate(result) if value is not None]
+    assert positions == [(i + 1) * factor - 1 for i in range(count)]
+    assert np.allclose([result[i] for i in positions], expected, rtol=0, atol=1e-12)
+
+def test_decimator_reset_drops_partial_run():
+    decimator = Decimator(4)
+    assert decimator.process([1.0, 2.0, 3.0]) == [None, None, None]
+    decimator.reset()
+    assert decimator.process([5.0, 5.0, 5.0, 9.0]) == [None, None, None, 6.0]
+
+def make_config(sample_rate, rates):
+    analog = {f"ai{i}": {'enabled': True, 'rate': rate} for i, rate in enumerate(rates)}
+    analog['ai9'] = {'enabled': False, 'rate': 1.0}
+    return {'device': {'sample_rate': sample_rate}, 'analog': analog, 'digital': {'port0/line0': {'enabled': True}}, 'analog_output': {}}
+
+def test_channel_decimation():
+    config = make_config(1000.0, [None, 1000.0, 5000.0, 100.0, 300.0])
+    assert [channel_decimation(config, f"ai{i}") for i in range(5)] == [1, 1, 1, 10, 3]
+    config['device']['sample_rate'] = None
+    assert channel_decimation(config, 'ai3') == 1
+
+def test_rate_groups():
+    config = make_config(1000.0, [None, 100.0, 100.0, 500.0])
+    assert rate_groups(config) == [(1000.0, ['ai0', 'port0/line0']), (500.0, ['ai3']), (100.0, ['ai1', 'ai2'])]
+    assert channel_rates(config) == {'ai0': 1000.0, 'port0/line0': 1000.0, 'ai3': 500.0, 'ai1': 100.0, 'ai2': 100.0}
+
+def test_group_path():
+    assert group_path('data/session.csv', 10.0) == 'data/session.10Hz.csv'
+    assert group_path('data/session.journal', 0.5) == 'data/session.0.5Hz.journal'
@@ -0,0 +1,103 @@
+import os
+import csv
+import queue
+
+import pytest
+
+pytest.importorskip("PyQt5")
+from PyQt5.QtCore import QCoreApplication
+from GUI import RecordingWorker, DAQWorker
+
+CONFIG = {
+    'device': {'sample_rate': 10.0},
+    'analog': {'ai0': {'enabled': True, 'rate': None, 'calibration': None}, 'ai1': {'enabled': True, 'rate': 5.0, 'calibration': {'type': 'linear', 'units': 'bar'}}, 'ai2': {'enabled': False, 'rate': None, 'calibration': None}},
+    'digital': {'port0/line0': {'enabled': True, 'mode': 'Input'}},
+    'analog_output': {}
+}
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+
+    def writerow(self, row):
+        self.rows.append(dict(row))
+
+def samples(num_samples=25):
+    """Packets as DAQWorker.queue_data makes them at 10Hz, ai1 is at 5Hz."""
+    packets = []
+    for i in range(num_samples):
+        packet = {'timestamp': i * 0.1, 'ai0': float(i), 'port0/line0': i % 3 == 0}
+        if(i % 2 == 1):
+            packet['ai1'] = 10.0 * i
+        packets.append(packet)
+    return packets
+
+def summary_worker(interval, channels=None):
+    worker = RecordingWorker(channels, interval)
+    worker.update_config(CONFIG)
+    writer = ListWriter()
+    worker.writers = [(worker.active_groups[0][1][0], writer)]
+    return worker, writer
+
+def test_interval_averages_and_partial_last_interval():
+    worker, writer = summary_worker(1.0)
+    for packet in samples():
+        worker.summarize(packet)
+    #the partial last interval is written when recording stops
+    worker.write_summary()
+    assert [row['timestamp'] for row in writer.rows] == pytest.approx([0.9, 1.9, 2.4])
+    assert [row['ai0'] for row in writer.rows] == pytest.approx([4.5, 14.5, 22.0])
+    assert [row['ai1'] for row in writer.rows] == pytest.approx([50.0, 150.0, 220.0])
+
+def test_digital_channels_keep_their_last_value():
+    worker, writer = summary_worker(1.0)
+    for packet in samples():
+        worker.summarize(packet)
+    worker.write_summary()
+    assert [row['port0/line0'] for row in writer.rows] == [True, False, True]
+
+def test_summary_recorder_has_one_file():
+    worker = RecordingWorker(None, 0.5)
+    assert worker.recording_groups(CONFIG) == [(2.0, ['ai0', 'port0/line0', 'ai1'])]
+    every_sample = RecordingWorker()
+    assert every_sample.recording_groups(CONFIG) == [(10.0, ['ai0', 'port0/line0']), (5.0, ['ai1'])]
+
+def test_channel_subset():
+    worker = RecordingWorker(['ai1', 'ai2'])
+    assert worker.recording_groups(CONFIG) == [(5.0, ['ai1'])]
+    assert RecordingWorker(['ai2']).recording_groups(CONFIG) == []
+
+def test_summary_recording_writes_one_file(tmp_path):
+    worker = RecordingWorker(['ai0', 'ai1'], 1.0)
+    worker.update_config(CONFIG)
+    path = str(tmp_path / 'summary.csv')
+    assert worker.start_recording(path, CONFIG)
+    for packet in samples():
+        worker.data_queue.put(packet)
+    while not worker.data_queue.empty():
+        worker.msleep(5)
+    worker.stop_recording()
+    assert sorted(os.listdir(tmp_path)) == ['summary.config.json', 'summary.csv']
+    with open(path, newline='', encoding='utf-8') as f:
+        lines = list(csv.reader(f))
+    assert lines[0] == ['#units', 's', 'V', 'bar']
+    assert lines[1] == ['timestamp', 'ai0', 'ai1']
+    assert [float(value) for value in lines[4]] == pytest.approx([2.4, 22.0, 220.0])
+    assert len(lines) == 5
+
+def test_queue_data_feeds_active_recorders():
+    recorders = [RecordingWorker(), RecordingWorker(), RecordingWorker()]
+    recorders[0].active_flag.set()
+    recorders[2].active_flag.set()
+    plot_queue = queue.Queue(maxsize=2)
+    worker = DAQWorker(plot_queue, recorders)
+    worker.queue_data({'timestamp': [0.0, 0.1, 0.2], 'ai0': [1.0, 2.0, 3.0], 'ai1': [None, 5.0, None]})
+    expected = [{'timestamp': 0.0, 'ai0': 1.0}, {'timestamp': 0.1, 'ai0': 2.0, 'ai1': 5.0}, {'timestamp': 0.2, 'ai0': 3.0}]
+    for recorder, active in zip(recorders, (True, False, True)):
+        assert list(recorder.data_queue.queue) == (expected if active else [])
+    #the plots skip what does not fit, the recorders do not
+    assert list(plot_queue.queue) == expected[:2]
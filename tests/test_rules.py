@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from Acquisition import OutputRule, split_rules
+
+def rule(**settings):
+    base = {'input': 'ai0', 'condition': '>', 'threshold': 4.5, 'samples': 3, 'output': 'port1/line0', 'value': 1}
+    base.update(settings)
+    return base
+
+def brute_force(condition, threshold, samples, blocks):
+    """Index into each block where the rule is first met, by scanning every sample."""
+    run = 0
+    results = []
+    for block in blocks:
+        met = None
+        for i, value in enumerate(block):
+            run = run + 1 if condition(value, threshold) else 0
+            if(met is None and run >= samples):
+                met = i
+        results.append(met)
+    return results
+
+@pytest.mark.parametrize("condition", ['>', '>=', '<', '<=', '==', '!='])
+@pytest.mark.parametrize("samples", [1, 3, 8])
+def test_evaluate_matches_brute_force(condition, samples):
+    rng = np.random.default_rng(6)
+    blocks = [rng.integers(3, 7, size).astype(float).tolist() for size in (5, 1, 0, 12, 2, 9, 4)]
+    output_rule = OutputRule(rule(condition=condition, threshold=5, samples=samples))
+    expected = brute_force(output_rule.condition, 5.0, samples, blocks)
+    assert [output_rule.evaluate(block) for block in blocks] == expected
+
+def test_run_carries_across_blocks_until_reset():
+    output_rule = OutputRule(rule())
+    assert output_rule.evaluate([5.0, 5.0]) is None
+    assert output_rule.evaluate([5.0, 1.0]) == 0
+    output_rule.evaluate([5.0, 5.0])
+    output_rule.reset()
+    assert output_rule.evaluate([5.0]) is None
+
+def test_split_rules():
+    good = rule()
+    valid, errors = split_rules([good, rule(condition='~'), rule(threshold='high'), rule(value=2), {'input': 'ai0'}, 'ai0 > 4.5'])
+    assert valid == [good]
+    assert [error.split(':')[0] for error in errors] == ['Rule 2', 'Rule 3', 'Rule 4', 'Rule 5', 'Rule 6']
+    assert "Unknown rule condition" in errors[0]
+    assert "'condition'" in errors[3]
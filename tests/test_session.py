@@ -0,0 +1,121 @@
+import time
+import asyncio
+import threading
+import concurrent.futures
+
+import pytest
+
+from Acquisition import AcquisitionSession, null_config
+
+class FakeTasks:
+    """Stands in for DAQTasks and records the calls, failing if two overlap."""
+    def __init__(self):
+        self.task_configs = {}
+        self.user_inputs = {'port0/line0': 0}
+        self.analog_outputs = {'ao0': 0.0}
+        self.poll_interval = 0.0
+        self.rule_callback = None
+        self.calls = []
+        self.active = 0
+        self.overlaps = 0
+        self.samples = 0
+        self.written = []
+
+    def call(self, name):
+        self.active += 1
+        if(self.active > 1):
+            self.overlaps += 1
+        self.calls.append(name)
+        time.sleep(0.001)
+        self.active -= 1
+
+    def update_config(self, config):
+        self.call('update_config')
+        self.task_configs = {'analog': config['device']}
+
+    def set_rules(self, rules):
+        self.call('set_rules')
+
+    def start(self):
+        self.call('start')
+
+    def stop(self):
+        self.call('stop')
+
+    def close(self):
+        self.call('close')
+
+    def set_digital_output(self, channel, value):
+        self.user_inputs[channel] = value
+
+    def set_analog_output(self, channel, value):
+        self.analog_outputs[channel] = value
+
+    def set_outputs(self):
+        self.call('set_outputs')
+        self.written.append((dict(self.user_inputs), dict(self.analog_outputs)))
+
+    def read_block(self):
+        self.call('read_block')
+        timestamps = [self.samples + i for i in range(5)]
+        self.samples += 5
+        if(self.samples == 10):
+            self.rule_callback('port0/line0', 1, 0.001)
+        return {'timestamp': timestamps, 'ai0': [0.0] * 5}
+
+def make_session(**kwargs):
+    session = AcquisitionSession(null_config(), **kwargs)
+    fake = FakeTasks()
+    fake.rule_callback = session.tasks.rule_callback
+    session.tasks = fake
+    return session, fake
+
+def test_start_stream_write_stop():
+    rules = []
+    async def run():
+        loop_thread = threading.current_thread()
+        def rule_callback(*args):
+            rules.append((args, threading.current_thread() is loop_thread))
+        session, fake = make_session(rule_callback=rule_callback)
+        async with session:
+            blocks = []
+            async for block in session.stream():
+                blocks.append(block)
+                if(len(blocks) == 3):
+                    await session.write_output('port0/line0', 1)
+                    await session.write_output('ao0', 2)
+                    await session.stop()
+            with pytest.raises(KeyError):
+                await session.write_output('ai0', 1)
+        return fake, blocks
+    fake, blocks = asyncio.run(run())
+    assert [block['timestamp'][0] for block in blocks] == [0, 5, 10]
+    assert fake.calls[:3] == ['update_config', 'set_rules', 'start']
+    assert fake.calls[-2:] == ['stop', 'close']
+    assert fake.written == [({'port0/line0': 1}, {'ao0': 0.0}), ({'port0/line0': 1}, {'ao0': 2.0})]
+    #the rule callback is run on the event loop, not the executor thread
+    assert rules == [(('port0/line0', 1, 0.001), True)]
+
+def test_start_needs_a_config():
+    session = AcquisitionSession()
+    with pytest.raises(ValueError):
+        asyncio.run(session.start())
+
+def test_calls_are_serialized():
+    async def run():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            session, fake = make_session(executor=executor)
+            await session.start()
+            async def read():
+                async for block in session.stream():
+                    if(block['timestamp'][0] >= 200):
+                        break
+            async def write():
+                for i in range(40):
+                    await session.write_output('port0/line0', i % 2)
+            await asyncio.gather(read(), write(), write(), session.set_rules([]))
+            await session.close()
+            return fake
+    fake = asyncio.run(run())
+    assert fake.calls.count('set_outputs') == 80
+    assert fake.overlaps == 0
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from Acquisition import make_waveform, make_pattern, tile_periods, waveform_errors, normalize_config, null_config, MAX_PATTERN_SAMPLES
+
+def test_sine_and_ramp():
+    waveform = {'frequency': 10.0, 'amplitude': 2.0, 'offset': 1.0}
+    sine = make_waveform('Sine', waveform, 1000.0)
+    assert len(sine) == 100
+    assert sine[0] == pytest.approx(1.0)
+    assert sine[25] == pytest.approx(3.0)
+    assert sine[75] == pytest.approx(-1.0)
+    ramp = make_waveform('Ramp', waveform, 1000.0)
+    assert ramp[0] == pytest.approx(-1.0)
+    assert np.all(np.diff(ramp) > 0)
+    #a frequency above the rate still plays one sample per period
+    assert len(make_waveform('Sine', dict(waveform, frequency=5000.0), 1000.0)) == 1
+
+def test_file_waveform(tmp_path):
+    path = tmp_path / 'w.csv'
+    path.write_text("0.5,1\n1.5,2\n-2,3\n")
+    assert make_waveform('File', {'file': str(path)}, 1000.0).tolist() == [0.5, 1.5, -2.0]
+    path.write_text("3.25\n")
+    assert make_waveform('File', {'file': str(path)}, 1000.0).tolist() == [3.25]
+
+@pytest.mark.parametrize("mode, waveform", [
+    ('Sine', {'frequency': 0, 'amplitude': 1.0, 'offset': 0.0}),
+    ('Ramp', {'frequency': 10.0, 'offset': 0.0}),
+    ('Sine', {'frequency': '10', 'amplitude': 1.0, 'offset': 0.0}),
+    ('File', {'file': ''}),
+    ('Square', {'frequency': 10.0, 'amplitude': 1.0, 'offset': 0.0}),
+])
+def test_bad_waveforms_raise_value_error(mode, waveform):
+    with pytest.raises(ValueError):
+        make_waveform(mode, waveform, 1000.0)
+
+def test_tile_periods():
+    buffer = tile_periods([np.array([1, 2]), np.array([1, 2, 3])])
+    assert buffer.shape == (2, 6)
+    assert buffer[0].tolist() == [1, 2, 1, 2, 1, 2]
+    assert buffer[1].tolist() == [1, 2, 3, 1, 2, 3]
+    with pytest.raises(ValueError):
+        tile_periods([np.zeros(MAX_PATTERN_SAMPLES // 2 + 1), np.zeros(MAX_PATTERN_SAMPLES // 2 + 3)])
+
+def test_pattern():
+    assert make_pattern({'type': 'pulse', 'period': 1.0, 'duty_cycle': 0.25, 'delay': 0.25}, 8).tolist() == [0, 0, 1, 1, 0, 0, 0, 0]
+    assert make_pattern({'type': 'sequence', 'values': [1, 0, 1], 'step': 0.5}, 4).tolist() == [1, 1, 0, 0, 1, 1]
+
+def make_config(tmp_path, waveforms):
+    config = null_config()
+    config['analog_output'] = {channel: {'enabled': True, 'mode': mode, 'waveform': waveform} for channel, (mode, waveform) in waveforms.items()}
+    return normalize_config(config)
+
+def test_waveform_errors(tmp_path):
+    path = tmp_path / 'w.csv'
+    path.write_text("0.5\n1.5\n")
+    config = make_config(tmp_path, {
+        'ao0': ('File', {'file': str(path)}),
+        'ao1': ('Sine', {'frequency': 10}),
+        'ao2': ('Static', None),
+        'ao3': ('Ramp', {'frequency': 0}),
+        'ao4': ('File', {'file': str(tmp_path / 'missing.csv')}),
+        'ao5': ('Static', {'amplitude': 'big'}),
+    })
+    #missing entries are filled with the defaults
+    assert config['analog_output']['ao1']['waveform'] == {'frequency': 10, 'amplitude': 1.0, 'offset': 0.0, 'file': ''}
+    errors = waveform_errors(config)
+    assert [error.split(':')[0] for error in errors] == ['ao3', 'ao4', 'ao5']
+    assert "above 0Hz" in errors[0]